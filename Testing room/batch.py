@@ -0,0 +1,160 @@
+"""
+Simulateur vectorisé (NumPy) pour lancer beaucoup d'instances à la fois.
+
+Chaque instance est une ligne des tableaux (arrivée, temps restant, deadline),
+complétée par des tâches vides. Comme dans engine.py, chaque instance saute
+directement à son prochain événement (arrivée, fin d'exécution, changement de
+tarif, fin de l'attente ou tâche qui devient condamnée), avec sa propre
+horloge : une itération fait avancer toutes les instances d'un événement,
+avec des opérations sur les tableaux. Mêmes règles que greedy (EDF / LLF,
+avec ou sans cost_opt) et rolling_horizon dans task2.py.
+"""
+
+import numpy as np
+
+from tariff import PiecewiseTariff, Tariff, get_tariff
+from workload import task_arrays
+
+PENDING, ACTIVE, DONE, FAILED = 0, 1, 2, 3
+
+
+def simulate_batch(instances, strategy="EDF", tariff_model=2, cost_opt=False, rolling=False):
+    """
+    instances : liste d'instances, chacune une liste de Task ou un TaskSet
+    tariff_model : un modèle pour toutes les instances ou un modèle par instance
+    rolling : True pour la règle de rolling_horizon, False pour greedy
+
+    Renvoie un dict de tableaux (une case par instance) : total_cost, completed,
+    failed, completion_rate (en %) et end_time (minutes, instant où l'instance
+    n'a plus de tâche, comme current_time à la fin de greedy).
+    """
+    n_inst = len(instances)
+    width = max((len(tasks) for tasks in instances), default=0)
+    if np.isscalar(tariff_model) or isinstance(tariff_model, (Tariff, PiecewiseTariff)):
+        tariff_model = [tariff_model] * n_inst
+
+    arrival = np.zeros((n_inst, width), dtype=np.int64)
+    remaining = np.zeros((n_inst, width), dtype=np.int64)
+    deadline = np.zeros((n_inst, width), dtype=np.int64)
+    state = np.full((n_inst, width), DONE, dtype=np.int8) # Les cases vides sont "terminées"
+    for b, tasks in enumerate(instances):
+        n = len(tasks)
+        arrival[b, :n], remaining[b, :n], deadline[b, :n] = task_arrays(tasks)
+        state[b, :n] = PENDING
+    real = state == PENDING
+    total = real.sum(axis=1)
+
+    # Ordre d'entrée dans la liste des tâches actives (arrivée puis position dans la liste)
+    order = np.argsort(np.where(real, arrival, np.iinfo(np.int64).max), axis=1, kind="stable")
+    tie = np.empty_like(order)
+    np.put_along_axis(tie, order, np.arange(width)[None, :], axis=1)
+
+    # Tarifs : une ligne par tarif distinct (prix par minute, prochaine minute moins chère et prochain
+    # changement de prix, la dernière case vaut pour t >= horizon), which[b] = ligne de l'instance b
+    tariffs = [get_tariff(m) for m in tariff_model]
+    if not all(isinstance(tf, Tariff) for tf in tariffs):
+        # Les tableaux de prix par minute ne couvrent qu'une journée
+        raise ValueError("simulate_batch ne gère que les tarifs d'une journée (tariff_model entier ou Tariff), "
+                         "pas PiecewiseTariff : utiliser greedy / rolling_horizon")
+    distinct = list({id(tf): tf for tf in tariffs}.values())
+    which = np.array([distinct.index(tf) for tf in tariffs], dtype=np.int64)
+    horizon = min((tf.horizon for tf in distinct), default=0)
+    n_tariffs = len(distinct)
+    never = np.iinfo(np.int64).max
+    prices = np.array([tf.prices[:horizon] + [tf.tail] for tf in distinct]).reshape(n_tariffs, horizon + 1)
+    cheaper = np.array([[never if c == float("inf") else c for c in tf.next_lower[:horizon]] + [never]
+                        for tf in distinct], dtype=np.int64).reshape(n_tariffs, horizon + 1)
+    changes = np.array([[min(tf.next_change(m), never) for m in range(horizon)] + [never]
+                        for tf in distinct], dtype=np.int64).reshape(n_tariffs, horizon + 1)
+
+    # Clé combinée (clé de priorité, ordre) en un seul entier pour argmin
+    t_max = int(max(arrival.max(initial=0), deadline.max(initial=0))) + 2
+    scale = t_max + width + 2
+    rows = np.arange(n_inst)
+
+    total_cost = np.zeros(n_inst)
+    end_time = np.zeros(n_inst, dtype=np.int64) # Horloge de chaque instance
+
+    while True:
+        now = end_time
+        t = now[:, None]
+
+        # Arrivée des tâches, celles de durée nulle sont terminées si leur deadline n'est pas passée
+        arrived = (state == PENDING) & (arrival <= t)
+        state[arrived] = ACTIVE
+        state[arrived & (remaining == 0) & (deadline >= t)] = DONE
+
+        # Si (Temps actuel + Temps restant > Deadline), la tâche est condamnée
+        state[(state == ACTIVE) & (t + remaining > deadline)] = FAILED
+
+        active = state == ACTIVE
+        pending = state == PENDING
+        next_arrival = np.where(pending, arrival, never).min(axis=1, initial=never) # initial : instances vides
+        busy = active.any(axis=1)
+        idle = ~busy & pending.any(axis=1)
+        if not busy.any():
+            if not idle.any():
+                break
+            # Aucune tâche active nulle part : saut à la prochaine arrivée
+            end_time[idle] = next_arrival[idle]
+            continue
+
+        # Choix de la tâche selon la stratégie
+        if strategy == "EDF":
+            key = deadline
+        elif strategy == "LLF":
+            key = deadline - remaining
+        else:
+            key = np.zeros_like(deadline)
+        combined = np.where(active, key * scale + (tie + t_max), never)
+        current = combined.argmin(axis=1)
+
+        idx = np.minimum(now, horizon)
+        current_price = prices[which, idx]
+        next_change = changes[which, idx]
+        laxity = deadline[rows, current] - now - remaining[rows, current]
+
+        if rolling:
+            run = (cheaper[which, idx] > deadline[rows, current]) | (laxity == 0) | (current_price <= 1/60)
+        elif cost_opt:
+            run = (current_price < 2/60) | (laxity == 0)
+        else:
+            run = np.ones(n_inst, dtype=bool)
+        run &= busy
+
+        # Prochain événement : arrivée, changement de tarif, ou une autre tâche qui devient condamnée
+        latest = np.where(active, deadline - remaining + 1, never)
+        latest[rows, current] = never
+        end = np.minimum(np.minimum(next_arrival, next_change), latest.min(axis=1))
+        # Tâche exécutée : jusqu'à sa fin ou (LLF) jusqu'à ce que la suivante passe devant
+        run_end = np.minimum(end, now + remaining[rows, current])
+        if strategy == "LLF":
+            combined[rows, current] = never
+            second = combined.argmin(axis=1)
+            hold = np.where(combined[rows, second] < never, now + key[rows, second] - key[rows, current] + 1, never)
+            run_end = np.minimum(run_end, hold)
+        # Tâche en attente : jusqu'à laxité nulle au plus tard
+        end = np.where(run, run_end, np.minimum(end, now + laxity))
+
+        # Exécution de la tâche sur [now, end), prix constant sur le segment
+        r, c = rows[run], current[run]
+        duration = end[run] - now[run]
+        total_cost[run] += current_price[run] * duration
+        remaining[r, c] -= duration
+        if strategy == "LLF":
+            # Après le tri stable, la tâche exécutée reste devant les tâches de même laxité
+            tie[r, c] = -end[run]
+        finished = remaining[r, c] == 0
+        state[r[finished], c[finished]] = DONE
+
+        end_time[busy] = end[busy]
+        end_time[idle] = next_arrival[idle]
+
+    completed = ((state == DONE) & real).sum(axis=1)
+    return {
+        "total_cost": total_cost,
+        "completed": completed,
+        "failed": (state == FAILED).sum(axis=1),
+        "completion_rate": np.where(total > 0, completed / np.maximum(total, 1) * 100, 0.0),
+        "end_time": end_time,
+    }
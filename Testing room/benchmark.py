@@ -1,99 +1,152 @@
-import copy
-import time
+from concurrent.futures import ProcessPoolExecutor
 
-
-from task2 import greedy, rolling_horizon, tariff_model as tm2
-from Tasks import online_full_tasks, tariff_model as tm_tasks
+from tariff import hourly_price
+from task2 import greedy, rolling_horizon
+from Tasks import online_full_tasks
 from mv2_4 import solve_wan_qi_precision, TariffProfile
+from offline import INF, solve_preemptive_optimum, competitive_ratio
+from reservation import slot_reservation
+from workload import Task
 
-# --- 1. CLASSE UNIFIÉE ---
-class UnifiedTask:
-    def __init__(self, name, arrival_time, execution_time, deadline):
-        # Attributs requis par task2.py et Tasks.py (Glouton, Rolling Horizon, Online)
-        self.name = name
-        self.arrival_time = round(arrival_time * 60)
-        self.execution_time = round(execution_time * 60)
-        self.remaining_time = round(execution_time * 60)
-        self.deadline = round(deadline * 60)
-        
-        # Attributs requis par mv2_4.py (DP WAN & QI)
-        self.id = name
-        self.r = int(arrival_time * 60)
-        self.p = int(execution_time * 60)
-        self.d = int(deadline * 60)
-        self.original_r = arrival_time
-        self.original_d = deadline
-        self.duration_lbl = f"{execution_time}h"
-
-    def get_laxity(self, current_time):
-        # Méthode requise par task2.py et Tasks.py
-        return round(((self.deadline - current_time) - self.remaining_time), 2)
-        
-    def __repr__(self):
-        return f"Task({self.name}, arr={self.original_r}h, exec={self.duration_lbl}, dead={self.original_d}h)"
-
-
-# --- 2. CRÉATION DES PROFILS TARIFAIRES ---
+# --- 1. CRÉATION DES PROFILS TARIFAIRES ---
 # Pour task2.py et Tasks.py, on utilise le tariff_model = 2 (Peak 7h-11h et 17h-21h)
+# Pour mv2_4.py, le même modèle est recréé avec TariffProfile (voir profile_for_model)
 MODEL_TARIFAIRE_INT = 2 
 
-# Pour mv2_4.py, on recrée exactement le même modèle avec la classe TariffProfile
-profile_dp = TariffProfile()
-profile_dp.add_interval(0, 7, 1)    # OffPeak
-profile_dp.add_interval(7, 11, 3)   # Peak
-profile_dp.add_interval(11, 17, 1)  # OffPeak
-profile_dp.add_interval(17, 21, 3)  # Peak
-profile_dp.add_interval(21, 24, 1)  # OffPeak
-
 
-# --- 3. LES 3 DATASETS DE TEST ---
+# --- 2. LES 3 DATASETS DE TEST ---
 datasets = {
     "DATASET A : Standard (Mixte)": [
-        UnifiedTask("T1", 0, 2.5, 10),
-        UnifiedTask("T2", 2, 3, 8),
-        UnifiedTask("T3", 4, 2, 12),
-        UnifiedTask("T4", 6, 1, 9),
-        UnifiedTask("T5", 8, 2.3, 12)
+        Task("T1", 0, 2.5, 10),
+        Task("T2", 2, 3, 8),
+        Task("T3", 4, 2, 12),
+        Task("T4", 6, 1, 9),
+        Task("T5", 8, 2.3, 12)
     ],
     "DATASET B : Haute Congestion (Arrivées simultanées en heure de pointe)": [
-        UnifiedTask("C1", 7.0, 2.0, 9.5),
-        UnifiedTask("C2", 7.5, 1.5, 9.5),
-        UnifiedTask("C3", 8.0, 2.0, 11.0),
-        UnifiedTask("C4", 8.5, 1.0, 10.0),
+        Task("C1", 7.0, 2.0, 9.5),
+        Task("C2", 7.5, 1.5, 9.5),
+        Task("C3", 8.0, 2.0, 11.0),
+        Task("C4", 8.5, 1.0, 10.0),
     ],
     "DATASET C : Haute Laxité (Beaucoup de marge pour optimiser)": [
-        UnifiedTask("F1", 0.0, 4.0, 20.0),
-        UnifiedTask("F2", 2.0, 3.0, 22.0),
-        UnifiedTask("F3", 6.0, 5.0, 23.0),
+        Task("F1", 0.0, 4.0, 20.0),
+        Task("F2", 2.0, 3.0, 22.0),
+        Task("F3", 6.0, 5.0, 23.0),
     ]
 }
 
 
-# --- 4. EXÉCUTION DU BENCHMARK ---
-def run_benchmark():
-    for dataset_name, tasks in datasets.items():
-        print(f"\n{'='*60}")
-        print(f"🚀 LANCEMENT DU TEST : {dataset_name}")
-        print(f"{'='*60}")
+# --- 3. EXÉCUTION DU BENCHMARK ---
+def profile_for_model(tariff_model):
+    # TariffProfile (mv2_4.py) équivalent à un tariff_model de task2.py / Tasks.py
+    profile = TariffProfile()
+    for hour in range(24):
+        profile.add_interval(hour, hour + 1, hourly_price(hour, tariff_model))
+    return profile
+
+
+def run_dp(tasks, tariff_model):
+    return solve_wan_qi_precision(tasks, profile_for_model(tariff_model), verbose=False)
+
+def run_greedy(tasks, tariff_model):
+    return greedy(tasks, strategy="EDF", tariff_model=tariff_model, cost_opt=False, verbose=False)
 
-        # 1. Test Programmation Dynamique (mv2_4.py)
-        print("\n--- 1. DP (WAN & QI - Optimal Offline) ---")
-        tasks_dp = copy.deepcopy(tasks)
-        schedule, accepted, rejected, cost = solve_wan_qi_precision(tasks_dp, profile_dp)
-        print(f"Coût Total : {cost:.2f}")
-        print(f"Tâches acceptées : {len(accepted)}/{len(tasks)}")
+def run_rolling(tasks, tariff_model):
+    return rolling_horizon(tasks, strategy="EDF", tariff_model=tariff_model, verbose=False)
 
-        # 2. Test Greedy EDF (task2.py)
-        print("\n--- 2. GREEDY EDF (Sans opti coût) ---")
-        tasks_greedy = copy.deepcopy(tasks)
-        # On capture la sortie console standard de la fonction greedy
-        history_greedy = greedy(tasks_greedy, strategy="EDF", tariff_model=MODEL_TARIFAIRE_INT, cost_opt=False)
+def run_online(tasks, tariff_model):
+    return online_full_tasks(tasks, tariff_model=tariff_model, verbose=False)
 
-        # 3. Test Rolling Horizon (task2.py)
-        print("\n--- 3. ROLLING HORIZON ---")
-        tasks_rh = copy.deepcopy(tasks)
-        history_rh = rolling_horizon(tasks_rh, strategy="EDF", tariff_model=MODEL_TARIFAIRE_INT)
+def run_slots(tasks, tariff_model):
+    return slot_reservation(tasks, tariff_model=tariff_model, verbose=False)
+
+def run_offline(tasks, tariff_model):
+    return solve_preemptive_optimum(tasks, tariff_model, verbose=False)
+
+
+ALGORITHMS = {
+    "DP (WAN & QI - Optimal Offline)": run_dp,
+    "GREEDY EDF (Sans opti coût)": run_greedy,
+    "ROLLING HORIZON": run_rolling,
+    "ONLINE FULL TASKS": run_online,
+    "RÉSERVATION DE CRÉNEAUX": run_slots,
+    "OPTIMUM PRÉEMPTIF (Offline)": run_offline,
+}
+REFERENCE = "OPTIMUM PRÉEMPTIF (Offline)" # Pas de ratio pour la référence elle-même
+
+
+def run_job(job):
+    # Un point de la grille, exécuté dans un processus séparé.
+    # Les algorithmes ne modifient pas les tâches reçues : pas de deepcopy entre deux exécutions.
+    dataset_name, tasks, algorithm, tariff_model = job
+    result = ALGORITHMS[algorithm](tasks, tariff_model)
+    # Ratio compétitif : coût / coût préemptif minimum pour terminer les mêmes tâches (toujours exact)
+    ratio = None if algorithm == REFERENCE else competitive_ratio(result, tasks, tariff_model)
+    return dict(dataset=dataset_name, algorithm=algorithm, tariff_model=tariff_model,
+                total=len(tasks), ratio=ratio, **result.as_dict())
+
+
+def run_parallel_benchmark(datasets=datasets, algorithms=tuple(ALGORITHMS), tariff_models=(MODEL_TARIFAIRE_INT,), max_workers=None):
+    """
+    Lance la grille (dataset x algorithme x tarif) sur un ProcessPoolExecutor.
+    Les résultats sont renvoyés dans l'ordre de la grille, quel que soit
+    l'ordre de fin des processus.
+    """
+    jobs = [(name, tasks, algorithm, tariff_model)
+            for name, tasks in datasets.items()
+            for algorithm in algorithms
+            for tariff_model in tariff_models]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return add_optimum_ratios(list(pool.map(run_job, jobs)))
+
+
+def add_optimum_ratios(results):
+    """
+    Ajoute optimum_ratio (coût / coût de l'optimum hors ligne du même dataset et
+    du même tarif) et optimum_exact. L'optimum maximise d'abord le nombre de
+    tâches terminées : le ratio de coûts n'a de sens qu'à nombre égal, il vaut
+    None sinon. Au-delà de offline.EXACT_LIMIT tâches ou de
+    offline.STATE_BUDGET comparaisons d'états, l'optimum n'est qu'une borne
+    (exact=False) : le ratio aussi, optimum_exact vaut alors False.
+    Sans ligne de référence dans la grille, les deux valent None.
+    """
+    optima = {(r["dataset"], r["tariff_model"]): r for r in results if r["algorithm"] == REFERENCE}
+    for result in results:
+        optimum = optima.get((result["dataset"], result["tariff_model"]))
+        if optimum is None or result["algorithm"] == REFERENCE:
+            result["optimum_ratio"] = result["optimum_exact"] = None
+            continue
+        result["optimum_exact"] = optimum["exact"]
+        if len(result["completed"]) != len(optimum["completed"]):
+            result["optimum_ratio"] = None
+        elif optimum["cost"] == 0:
+            result["optimum_ratio"] = 1.0 if result["cost"] == 0 else INF
+        else:
+            result["optimum_ratio"] = result["cost"] / optimum["cost"]
+    return results
+
+
+def run_benchmark(max_workers=None):
+    current = None
+    for result in run_parallel_benchmark(max_workers=max_workers):
+        if result["dataset"] != current:
+            current = result["dataset"]
+            print(f"\n{'='*60}")
+            print(f"🚀 LANCEMENT DU TEST : {current}")
+            print(f"{'='*60}")
+        label = result["algorithm"] if result["exact"] else "BORNE PRÉEMPTIVE (Offline, non garantie optimale)"
+        print(f"\n--- {label} (tarif {result['tariff_model']}) ---")
+        print(f"Coût Total : {result['cost']:.2f}")
+        print(f"Tâches terminées : {len(result['completed'])}/{result['total']}")
+        if result["ratio"] is not None:
+            print(f"Ratio compétitif (mêmes tâches) : {result['ratio']:.3f}")
+        bound = "" if result["optimum_exact"] else " (BORNE : optimum hors ligne non garanti)"
+        if result["optimum_ratio"] is not None:
+            print(f"Ratio à l'optimum hors ligne : {result['optimum_ratio']:.3f}{bound}")
+        elif result["optimum_exact"] is not None:
+            print(f"Ratio à l'optimum hors ligne : - (pas le même nombre de tâches terminées){bound}")
 
 
 if __name__ == "__main__":
-    run_benchmark()
\ No newline at end of file
+    run_benchmark()
@@ -0,0 +1,282 @@
+"""
+Moteur de simulation à événements discrets.
+
+Au lieu d'avancer minute par minute, la simulation saute directement au
+prochain événement : arrivée d'une tâche, fin d'exécution, changement de
+tarif ou instant où une tâche en attente devient condamnée (laxité < 0).
+Entre deux événements la décision de la politique ne change pas, on applique
+donc tout le segment d'un coup.
+"""
+
+import math
+import time
+from heapq import heappush, heappop, heapify
+
+from history import ExecutionHistory
+from results import ScheduleResult
+from workload import TaskSet
+
+INF = math.inf
+
+
+def priority_key(strategy):
+    # EDF : deadline, LLF : laxité + temps actuel (même ordre que get_laxity à t fixé)
+    if strategy == "EDF":
+        return lambda x: x.deadline
+    if strategy == "LLF":
+        return lambda x: x.deadline - x.remaining_time
+    return lambda x: 0 # Ordre d'arrivée
+
+
+class ReadyQueue:
+    """
+    Tâches actives dans un tas binaire, triées par (clé, ordre d'entrée) comme
+    le tri stable de la liste à chaque minute. Les suppressions sont paresseuses :
+    l'entrée est marquée périmée et ignorée quand elle remonte en tête du tas.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.heap = [] # Entrées [clé, ordre, tâche], tâche = None si périmée
+        self.entries = {} # Tâche -> entrée valide
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, task):
+        return task in self.entries
+
+    def __iter__(self):
+        return iter(list(self.entries))
+
+    def order(self, task):
+        # Position de la tâche dans l'ordre de priorité (pour trier un petit groupe)
+        return self.entries[task][:2]
+
+    def push(self, task):
+        self.counter += 1
+        entry = [self.key(task), self.counter, task]
+        self.entries[task] = entry
+        heappush(self.heap, entry)
+
+    def remove(self, task):
+        self.entries.pop(task)[-1] = None
+        # Compactage quand le tas contient surtout des entrées périmées
+        if len(self.heap) > 2 * len(self.entries) + 16:
+            self.heap = [e for e in self.heap if e[-1] is not None]
+            heapify(self.heap)
+
+    def update(self, task):
+        # À appeler quand la clé d'une tâche change (exécution en LLF)
+        entry = self.entries[task]
+        key = self.key(task)
+        if key == entry[0]:
+            return
+        entry[-1] = None
+        # Après un tri stable, la tâche qui était en tête passe devant les tâches de même clé
+        self.counter += 1
+        entry = [key, -self.counter, task]
+        self.entries[task] = entry
+        heappush(self.heap, entry)
+
+    def _clean(self):
+        while self.heap[0][-1] is None:
+            heappop(self.heap)
+
+    def first(self):
+        self._clean()
+        return self.heap[0][-1]
+
+    def first_two(self):
+        # Les deux tâches les plus prioritaires (la seconde vaut None s'il n'y en a qu'une)
+        self._clean()
+        top = heappop(self.heap)
+        second = self.first() if len(self.entries) > 1 else None
+        heappush(self.heap, top)
+        return top[-1], second
+
+    def first_k(self, k):
+        # Les k tâches les plus prioritaires, dans l'ordre, en O(k log n) sans parcourir la file
+        top = []
+        while self.heap and len(top) < k:
+            entry = heappop(self.heap)
+            if entry[-1] is not None: # Les entrées périmées sont simplement jetées
+                top.append(entry)
+        for entry in top:
+            heappush(self.heap, entry)
+        return [entry[-1] for entry in top]
+
+
+class Simulation:
+    """
+    État d'une exécution. Les tâches reçues (liste de Task ou TaskSet) forment
+    une charge immuable : chaque Task est recréée à son arrivée à partir des
+    tableaux du TaskSet, et c'est cette copie que la simulation modifie.
+    reset() remet l'état à zéro sans copier la charge, pour rejouer les mêmes
+    tâches avec une autre politique ou un autre tarif.
+    """
+
+    def __init__(self, tasks_list, tariff, strategy="EDF"):
+        workload = tasks_list if isinstance(tasks_list, TaskSet) else TaskSet.from_tasks(tasks_list)
+        # Tâches triées une seule fois par date d'arrivée (tri stable)
+        self.pending = workload.by_arrival()
+        self.arrivals = self.pending.arrival_time.tolist()
+        self.total_initial = len(workload) # Nombre total de tâches initiales
+        self.reset(tariff, strategy)
+
+    def reset(self, tariff=None, strategy=None):
+        # Nouvelle exécution sur la même charge, en O(1) : les Task sont recréées à l'arrivée
+        if tariff is not None:
+            self.tariff = tariff # Tarif précalculé (voir tariff.py)
+        if strategy is not None:
+            self.strategy = strategy
+        self.current_time = 0 # Début de la simulation
+        self.cursor = 0 # Index de la prochaine tâche à arriver
+        self.active = ReadyQueue(priority_key(self.strategy)) # File des tâches actives
+        # Mêmes tâches, par date de début au plus tard (deadline - temps restant)
+        self.latest_starts = ReadyQueue(lambda x: x.deadline - x.remaining_time)
+        self.completed = [] # Liste des tâches complétées
+        self.failed = [] # Liste des tâches échouées
+        self.history = ExecutionHistory() # Historique (segments) pour le diagramme de Gantt
+        self.total_cost = 0 # Coût total de l'ordonnancement
+        self.preemptions = 0 # Interruptions d'une tâche commencée et non terminée
+        self.makespan = 0 # Fin de la dernière minute exécutée
+        self.last_task = None
+        self.start_wall_time = time.perf_counter()
+        return self
+
+    def has_pending(self):
+        return self.cursor < len(self.arrivals)
+
+    def next_arrival(self):
+        return self.arrivals[self.cursor] if self.has_pending() else INF
+
+    def next_miss(self, running=None):
+        # Premier instant où une tâche en attente a (Temps actuel + Temps restant > Deadline)
+        # La laxité de la tâche en cours d'exécution reste constante
+        if not self.latest_starts:
+            return INF
+        task, second = self.latest_starts.first_two()
+        if task is running:
+            task = second
+        return INF if task is None else task.deadline - task.remaining_time + 1
+
+    def enqueue(self, task):
+        # Tâche de durée nulle (arrondie à 0 minute) : terminée dès son arrivée, sauf si sa deadline est passée
+        if task.remaining_time == 0 and self.current_time <= task.deadline:
+            self.completed.append(task)
+            return False
+        self.active.push(task)
+        self.latest_starts.push(task)
+        return True
+
+    def admit(self):
+        # Ajout des tâches qui sont arrivées
+        new_arrivals = []
+        while self.cursor < len(self.arrivals) and self.arrivals[self.cursor] <= self.current_time:
+            task = self.pending[self.cursor]
+            if self.enqueue(task):
+                new_arrivals.append(task)
+            self.cursor += 1
+        return new_arrivals
+
+    def drop_missed(self, new_arrivals=()):
+        # Si (Temps actuel + Temps restant > Deadline), la tâche est condamnée et supprimée
+        # On ne dépile que les tâches dont la date de début au plus tard est dépassée
+        missed = []
+        while self.latest_starts:
+            task = self.latest_starts.first()
+            if (self.current_time + task.remaining_time) <= task.deadline:
+                break
+            missed.append(task)
+            self.latest_starts.remove(task)
+        # Même ordre que la liste : tâches déjà triées puis nouvelles arrivées
+        missed.sort(key=lambda t: (t in new_arrivals, self.active.order(t)))
+        for t in missed:
+            self.failed.append(t)
+            self.active.remove(t)
+
+    def execute(self, task, end):
+        # Exécute la tâche sur [current_time, end), le prix doit être constant sur le segment
+        start = self.current_time
+        price = self.tariff.price_at(start)
+        if self.last_task is not None and self.last_task is not task and self.last_task in self.active:
+            self.preemptions += 1
+        self.last_task = task
+        self.makespan = end
+        self.total_cost += self.tariff.cost(start, end)
+        self.history.append_run(start, end, task.name, price * 60)
+        task.remaining_time -= end - start
+        self.current_time = end
+        if task.remaining_time == 0:
+            self.active.remove(task)
+            self.latest_starts.remove(task)
+            self.completed.append(task)
+        else:
+            self.active.update(task)
+            self.latest_starts.update(task)
+
+    def skip(self, end):
+        self.current_time = end
+
+    def result(self):
+        return ScheduleResult(
+            cost=self.total_cost,
+            completed=[t.name for t in self.completed],
+            failed=[t.name for t in self.failed],
+            makespan=self.makespan,
+            preemptions=self.preemptions,
+            wall_time=time.perf_counter() - self.start_wall_time,
+            history=self.history,
+        )
+
+
+def selection_hold(sim, strategy):
+    # Instant jusqu'auquel la tâche en tête le reste si elle s'exécute sans interruption
+    if strategy != "LLF" or len(sim.active) == 1:
+        return INF
+    task, second = sim.active.first_two()
+    # Sa laxité est constante, celle des autres baisse d'une unité par minute
+    t = sim.current_time
+    return t + second.get_laxity(t) - task.get_laxity(t) + 1
+
+
+def head_policy(rule, strategy):
+    """
+    decide(sim) à partir d'une règle par tâche rule(sim, tâche) -> (exécuter ?,
+    instant jusqu'auquel la décision reste valable) : la règle est appliquée à la
+    tête de la file, qui le reste jusqu'à selection_hold si elle s'exécute.
+    La même règle sert au mode multi-machines (multi.py).
+    """
+    def decide(sim):
+        task = sim.active.first()
+        execute, until = rule(sim, task)
+        if execute:
+            until = min(until, selection_hold(sim, strategy))
+        return task, execute, until
+    return decide
+
+
+def run_policy(sim, decide):
+    """
+    Boucle principale : à chaque événement, la politique renvoie
+    (tâche, exécuter ?, instant jusqu'auquel la décision reste valable).
+    """
+    while sim.has_pending() or sim.active:
+        new_arrivals = sim.admit()
+        sim.drop_missed(new_arrivals)
+
+        t = sim.current_time
+        if sim.active:
+            task, execute, until = decide(sim)
+            end = min(until, sim.next_arrival(), sim.next_miss(task if execute else None))
+            if execute:
+                end = min(end, t + task.remaining_time, sim.tariff.next_change(t))
+                sim.execute(task, end)
+            else:
+                sim.skip(end)
+        else:
+            sim.skip(max(t + 1, sim.next_arrival()) if sim.has_pending() else t + 1)
+
+    return sim
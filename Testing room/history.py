@@ -0,0 +1,59 @@
+class ExecutionHistory:
+    """
+    Historique d'exécution compressé (run-length) : un segment
+    (début, fin, tâche, prix) par période où la même tâche s'exécute au même
+    prix, au lieu d'une ligne par minute.
+    Itérer sur l'historique redonne les lignes (minute, tâche, prix) minute par minute.
+    """
+
+    def __init__(self):
+        self.segments = []
+
+    def append_run(self, start, end, task_name, price):
+        # Ajoute l'exécution de task_name sur [start, end), fusionnée avec le segment précédent si possible
+        if end <= start:
+            return
+        if self.segments:
+            last_start, last_end, last_name, last_price = self.segments[-1]
+            if last_end == start and last_name == task_name and last_price == price:
+                self.segments[-1] = (last_start, end, task_name, price)
+                return
+        self.segments.append((start, end, task_name, price))
+
+    def append(self, row):
+        # Compatibilité avec l'ancien format : une ligne (minute, tâche, prix)
+        minute, task_name, price = row
+        self.append_run(minute, minute + 1, task_name, price)
+
+    def __iter__(self):
+        for start, end, task_name, price in self.segments:
+            for minute in range(start, end):
+                yield (minute, task_name, price)
+
+    def __len__(self):
+        # Nombre de minutes exécutées
+        return sum(end - start for start, end, _, _ in self.segments)
+
+    def __bool__(self):
+        return bool(self.segments)
+
+    def __repr__(self):
+        return f"ExecutionHistory({len(self.segments)} segments, {len(self)} minutes)"
+
+
+def as_segments(history):
+    # Segments (début, fin, tâche, prix) d'un ExecutionHistory ou d'une liste minute par minute
+    if isinstance(history, ExecutionHistory):
+        return history.segments
+    compressed = ExecutionHistory()
+    for row in history:
+        compressed.append(row)
+    return compressed.segments
+
+
+def merge_histories(histories):
+    # Un seul historique à partir des historiques par machine, segments triés par début
+    # (des segments de machines différentes peuvent se chevaucher)
+    merged = ExecutionHistory()
+    merged.segments = sorted(segment for history in histories for segment in as_segments(history))
+    return merged
@@ -0,0 +1,173 @@
+"""
+Ordonnancement sur plusieurs machines identiques.
+
+Deux modes de répartition :
+
+- global : une seule file de priorité (EDF / LLF) pour toutes les machines.
+  À chaque événement, les m tâches en tête de la file sont prises par m
+  dépilements du tas (O(m log n)), sans parcourir la file pour chaque machine.
+  Chaque tâche choisie applique la même règle que sur une machine (exécuter
+  ou attendre un prix plus bas) ; une machine dont la tâche attend reste
+  libre, comme la machine unique quand la tête de file attend.
+  Une tâche qui continue garde sa machine, les autres prennent les machines
+  libérées. online_full_tasks n'y garde que sa règle par tâche
+  (Tasks.online_rule) : ni échange de tâche à l'arrivée, ni tâche terminée
+  après sa deadline ; avec une seule machine, il reste sur sa propre boucle.
+- partitioned : chaque tâche est affectée à son arrivée à une machine (celle
+  qui se libère le plus tôt, estimation par un tas des fins prévues), puis
+  chaque machine est simulée seule avec l'algorithme d'origine.
+
+Les résultats gardent un historique par machine (result.histories) ; le coût
+est la somme des coûts de toutes les machines.
+"""
+
+import time
+from heapq import heappush, heappop
+
+import numpy as np
+
+from engine import INF, Simulation
+from history import ExecutionHistory, merge_histories
+from results import ScheduleResult
+from workload import TaskSet
+
+
+class MultiSimulation(Simulation):
+    """
+    Simulation à m machines avec une file commune. Même état que Simulation
+    (active, latest_starts, completed, failed...), plus un historique par
+    machine et l'affectation tâche -> machine du dernier segment exécuté.
+    """
+
+    def __init__(self, tasks_list, tariff, strategy="EDF", machines=2):
+        self.machines = machines
+        super().__init__(tasks_list, tariff, strategy)
+
+    def reset(self, tariff=None, strategy=None):
+        super().reset(tariff, strategy)
+        self.histories = [ExecutionHistory() for _ in range(self.machines)]
+        self.running = {} # Tâche -> machine, pour les tâches du dernier segment
+        return self
+
+    def next_miss(self, running=()):
+        # Premier instant où une tâche qui n'est pas en cours d'exécution devient condamnée
+        for task in self.latest_starts.first_k(len(running) + 1):
+            if task not in running:
+                return task.deadline - task.remaining_time + 1
+        return INF
+
+    def assign(self, tasks):
+        # Machines des tâches exécutées sur le prochain segment : une tâche qui continue garde la sienne
+        previous = self.running
+        running = {task: previous[task] for task in tasks if task in previous}
+        free = sorted(set(range(self.machines)) - set(running.values()), reverse=True)
+        for task in tasks:
+            if task not in running:
+                running[task] = free.pop()
+        for task in previous:
+            if task not in running and task in self.active:
+                self.preemptions += 1
+        self.running = running
+
+    def execute_all(self, tasks, end):
+        # Exécute les tâches en parallèle sur [current_time, end), prix constant sur le segment
+        if not tasks:
+            self.current_time = end # Toutes les machines attendent, affectations inchangées
+            return
+        self.assign(tasks)
+        start = self.current_time
+        price = self.tariff.price_at(start)
+        cost = self.tariff.cost(start, end)
+        for task in tasks:
+            self.total_cost += cost
+            self.histories[self.running[task]].append_run(start, end, task.name, price * 60)
+            task.remaining_time -= end - start
+            if task.remaining_time == 0:
+                self.active.remove(task)
+                self.latest_starts.remove(task)
+                self.completed.append(task)
+            else:
+                self.active.update(task)
+                self.latest_starts.update(task)
+        self.makespan = end
+        self.current_time = end
+
+    def result(self):
+        result = super().result()
+        result.history = merge_histories(self.histories)
+        result.histories = self.histories
+        return result
+
+
+def run_global(sim, rule):
+    """
+    Boucle principale du mode global. rule(sim, tâche) -> (exécuter ?, instant
+    jusqu'auquel la décision reste valable), comme pour engine.head_policy.
+    """
+    m = sim.machines
+    while sim.has_pending() or sim.active:
+        new_arrivals = sim.admit()
+        sim.drop_missed(new_arrivals)
+
+        t = sim.current_time
+        if not sim.active:
+            sim.skip(max(t + 1, sim.next_arrival()) if sim.has_pending() else t + 1)
+            continue
+
+        # Les m premières tâches, plus la suivante pour savoir quand le choix change (LLF)
+        top = sim.active.first_k(m + 1)
+        executing, until = [], INF
+        for task in top[:m]:
+            execute, task_until = rule(sim, task)
+            until = min(until, task_until)
+            if execute:
+                executing.append(task)
+
+        end = min(until, sim.next_arrival(), sim.next_miss(executing))
+        if executing:
+            end = min(end, sim.tariff.next_change(t), min(t + task.remaining_time for task in executing))
+            if sim.strategy == "LLF" and len(top) > m:
+                # La clé des tâches exécutées augmente d'une unité par minute, celle des autres est fixe
+                key = sim.active.key
+                end = min(end, t + key(top[m]) - max(key(task) for task in executing) + 1)
+        sim.execute_all(executing, end)
+
+    return sim
+
+
+def partition(tasks_list, machines):
+    """
+    Affectation statique des tâches (dans l'ordre d'arrivée) : chaque tâche va à
+    la machine qui se libère le plus tôt d'après les durées déjà affectées.
+    Renvoie un TaskSet par machine.
+    """
+    workload = tasks_list if isinstance(tasks_list, TaskSet) else TaskSet.from_tasks(tasks_list)
+    workload = workload.by_arrival()
+    free_at = [(0, machine) for machine in range(machines)] # Tas (fin prévue, machine)
+    parts = [[] for _ in range(machines)]
+    for i, (arrival, execution) in enumerate(zip(workload.arrival_time.tolist(), workload.execution_time.tolist())):
+        end, machine = heappop(free_at)
+        parts[machine].append(i)
+        heappush(free_at, (max(end, arrival) + execution, machine))
+    return [workload.take(np.array(part, dtype=np.int64)) for part in parts]
+
+
+def run_partitioned(tasks_list, machines, run, verbose=True):
+    # run(TaskSet) -> ScheduleResult pour une machine ; résultats regroupés
+    start_wall_time = time.perf_counter()
+    results = [run(part) for part in partition(tasks_list, machines)]
+    result = ScheduleResult(
+        cost=sum(r.cost for r in results),
+        completed=[name for r in results for name in r.completed],
+        failed=[name for r in results for name in r.failed],
+        makespan=max(r.makespan for r in results),
+        preemptions=sum(r.preemptions for r in results),
+        wall_time=time.perf_counter() - start_wall_time,
+        history=merge_histories(r.history for r in results),
+        histories=[r.history for r in results],
+    )
+    if verbose:
+        print("Simulation completed in", result.wall_time, "seconds.")
+        print("Total cost:", round(result.cost, 2))
+        print("Completed tasks:", result.completion_rate, "%")
+    return result
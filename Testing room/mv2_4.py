@@ -1,114 +1,205 @@
-import matplotlib.pyplot as plt
 import math
+import time
 
+import numpy as np
 
-class Task:
-    def __init__(self, name, arrival_time, execution_time, deadline):
-        """
-        name : Identifiant (ex: "T1")
-        arrival_time : Date d'arrivée en heures (ex: 0.5 pour 0h30)
-        execution_time : Durée en heures (ex: 1.5 pour 1h30)
-        deadline : Date limite en heures (ex: 10 pour 10h00)
-        """
-        self.id = name
-        
-        # Conversion interne en minutes pour la précision de l'algo
-        self.r = int(arrival_time * 60)      # Release date
-        self.p = int(execution_time * 60)    # Processing time
-        self.d = int(deadline * 60)          # Deadline
-        
-        # Pour l'affichage graphique
-        self.original_r = arrival_time
-        self.original_d = deadline
-        self.duration_lbl = f"{execution_time}h"
+from results import ScheduleResult
+from workload import Task
 
-    def __repr__(self):
-        return f"Task({self.id}, r={self.original_r}h, p={self.duration_lbl}, d={self.original_d}h)"
 
 class TariffProfile:
-    def __init__(self):
-        self.horizon_min = 1440 # 24h en minutes
-        self.prices = [0.0] * self.horizon_min
+    def __init__(self, horizon_min=1440):
+        self.horizon_min = horizon_min # 24h en minutes par défaut, plusieurs jours possibles
+        self.prices = np.zeros(self.horizon_min)
+        # prefix[t] = coût d'exécution sur [0, t), mis à jour par add_interval
+        self.prefix = np.zeros(self.horizon_min + 1)
         
-    def add_interval(self, start_hour, end_hour, price_per_hour):
+    def add_interval(self, start_hour, end_hour, price_per_hour, period_hours=None):
+        # period_hours : l'intervalle se répète (ex : 24 pour tous les jours de l'horizon)
         price_per_min = price_per_hour / 60.0
-        start_min = int(start_hour * 60)
-        end_min = int(end_hour * 60)
-        
-        for t in range(start_min, end_min):
-            if t < self.horizon_min:
-                self.prices[t] = price_per_min
+        first_min = max(int(start_hour * 60), 0)
+        step = int(period_hours * 60) if period_hours else self.horizon_min
+        for offset in range(0, self.horizon_min, step):
+            start_min = max(int(start_hour * 60) + offset, 0)
+            end_min = min(int(end_hour * 60) + offset, self.horizon_min)
+            if start_min < end_min:
+                self.prices[start_min:end_min] = price_per_min
+        if first_min >= self.horizon_min:
+            return
+
+        # Seules les sommes à partir du premier intervalle changent
+        self.prefix[first_min + 1:] = self.prefix[first_min] + np.cumsum(self.prices[first_min:])
 
     def get_cost(self, start_min, end_min):
+        # Coût sur [start_min, end_min) en O(1)
         if start_min >= self.horizon_min: return float('inf')
-        real_end = min(end_min, self.horizon_min)
-        total = sum(self.prices[t] for t in range(start_min, real_end))
-        return total
+        real_end = max(min(end_min, self.horizon_min), start_min)
+        return float(self.prefix[real_end] - self.prefix[start_min])
+
+    def get_costs(self, starts, ends):
+        # Version vectorisée de get_cost pour des tableaux de débuts et de fins
+        starts = np.asarray(starts)
+        real_ends = np.maximum(np.minimum(ends, self.horizon_min), starts)
+        valid = starts < self.horizon_min
+        safe_starts = np.where(valid, starts, 0)
+        costs = self.prefix[np.where(valid, real_ends, 0)] - self.prefix[safe_starts]
+        return np.where(valid, costs, np.inf)
 
 # --- 2. ALGORITHME WAN & QI (DP PRÉCISE) ---
 
-def solve_wan_qi_precision(tasks, tariff_profile):
+PRUNE_MIN = 32 # En dessous, l'élagage coûte plus qu'il ne fait gagner
+
+def prune_states(live, count, cost, next_release):
+    """
+    Élagage par dominance des états de la table. live : fins des états existants
+    (triées) ; renvoie celles qui restent (count[t] = -1 pour un état supprimé).
+
+    Élagage exact :
+      - un état battu en nombre de tâches par un état qui finit plus tôt ne peut
+        plus le rattraper (tout ce qui est faisable après lui l'est aussi plus tôt) ;
+      - les états qui finissent avant next_release (plus petite arrivée des tâches
+        restantes) ont le même avenir : on garde le meilleur (nombre, puis coût).
+    Pas d'élagage sur le coût entre deux fins différentes : une tâche commence dès
+    max(fin, arrivée), un état qui finit plus tôt a donc un autre avenir, dont le
+    coût n'est pas borné par celui de l'état supprimé.
+    """
+    counts = count[live]
+    keep = counts >= np.maximum.accumulate(counts)
+
+    # Même avenir pour les états avant next_release : un seul gardé
+    idx = np.flatnonzero(keep[:np.searchsorted(live, next_release, side="right")])
+    if len(idx) > 1:
+        best = idx[np.lexsort((cost[live[idx]], -counts[idx]))[0]]
+        keep[idx] = False
+        keep[best] = True
+
+    count[live[~keep]] = -1
+    return live[keep]
+
+
+def solve_wan_qi_precision(tasks, tariff_profile, verbose=True, prune=False):
+    """
+    Renvoie un ScheduleResult (planning dans result.schedule).
+    prune : élagage exact des états dominés (voir prune_states).
+            Les transitions ne parcourent que les états vivants (tableau trié
+            des fins) : moins d'états, moins de travail. Élagage amorti, refait
+            quand le nombre d'états a doublé. Gain faible quand peu d'états sont
+            dominés, d'où la désactivation par défaut
+    """
+    start_wall_time = time.perf_counter()
+
+    tasks = list(tasks) # Liste de Task ou TaskSet
+
     # 1. Tri EDD (Earliest Deadline First)
     sorted_tasks = sorted(tasks, key=lambda t: t.d)
+    # next_releases[k] = plus petite arrivée des tâches après la k-ième
+    next_releases = [math.inf] * len(sorted_tasks)
+    for k in range(len(sorted_tasks) - 2, -1, -1):
+        next_releases[k] = min(next_releases[k + 1], sorted_tasks[k + 1].r)
     
-    # DP[t_min] = (nb_taches, cout, liste_taches_planifiees)
-    dp = {0: (0, 0.0, [])}
-    
-    print(f"Planification de {len(tasks)} tâches...")
+    # Table dense sur [0, horizon] indexée par la fin de la dernière tâche :
+    # count[t] = nb de tâches (-1 si aucun état ne finit à t), cost[t] = coût, node[t] = noeud
+    horizon = tariff_profile.horizon_min
+    count = np.full(horizon + 1, -1, dtype=np.int64)
+    cost = np.zeros(horizon + 1)
+    node = np.zeros(horizon + 1, dtype=np.int64)
+    count[0] = 0
+    live = np.zeros(1, dtype=np.int64) # Fins des états existants, triées
+    pruned = PRUNE_MIN # Nombre d'états après le dernier élagage
+    # Chaque noeud garde seulement (noeud précédent, tâche, début)
+    parent = [-1] # parent[noeud] = noeud précédent (-1 pour la racine)
+    node_task = [None] # Tâche ajoutée par le noeud
+    node_start = [0] # Début de cette tâche
+
+    if verbose:
+        print(f"Planification de {len(tasks)} tâches...")
     
-    for task in sorted_tasks:
-        current_dp = dp.copy()
-        
-        for t_prev, (count, cost, schedule) in current_dp.items():
-            
-            # Début = max(fin_tache_precedente, date_arrivee_tache)
-            start_time = max(t_prev, task.r)
-            end_time = start_time + task.p
-            
-            # Contraintes
-            if end_time > tariff_profile.horizon_min: continue
-            if end_time > task.d: continue
-            
-            # Calcul coût
-            segment_cost = tariff_profile.get_cost(start_time, end_time)
-            
-            new_count = count + 1
-            new_cost = cost + segment_cost
-            new_sched = schedule + [(task, start_time, end_time)]
-            
-            # Mise à jour DP (Maximiser Nombre, puis Minimiser Coût)
-            if end_time not in dp:
-                dp[end_time] = (new_count, new_cost, new_sched)
-            else:
-                old_count, old_cost, _ = dp[end_time]
-                if new_count > old_count or (new_count == old_count and new_cost < old_cost):
-                    dp[end_time] = (new_count, new_cost, new_sched)
-                    
+    for k, task in enumerate(sorted_tasks):
+        # Début = max(fin_tache_precedente, date_arrivee_tache), fin <= min(deadline, horizon)
+        last_end = min(task.d, horizon)
+        if task.r + task.p > last_end:
+            continue
+
+        # États finissant avant l'arrivée : ils mènent tous à [r, r + p), on garde le meilleur
+        # (Maximiser Nombre, puis Minimiser Coût)
+        split = np.searchsorted(live, task.r, side="right")
+        early = live[:split]
+        src_early = None
+        if len(early):
+            early_count = count[early]
+            ties = early[early_count == early_count.max()]
+            src_early = int(ties[np.argmin(cost[ties])])
+
+        # États finissant après l'arrivée : la tâche commence dès la fin, décalage de p
+        src = live[split:np.searchsorted(live, last_end - task.p, side="right")]
+        if src_early is not None:
+            src = np.concatenate(([src_early], src))
+        if not len(src):
+            continue
+        start = np.maximum(src, task.r)
+        end = start + task.p
+        new_count = count[src] + 1
+        new_cost = cost[src] + tariff_profile.get_costs(start, end)
+
+        # Mise à jour DP (Maximiser Nombre, puis Minimiser Coût) par rapport aux états d'avant la tâche
+        better = (new_count > count[end]) | ((new_count == count[end]) & (new_cost < cost[end]))
+        src, start, end = src[better], start[better], end[better]
+        fresh = end[count[end] < 0] # Nouvelles fins (croissantes, comme src)
+        first_node = len(parent)
+        parent.extend(node[src].tolist())
+        node_task.extend([task] * len(src))
+        node_start.extend(start.tolist())
+        count[end] = new_count[better]
+        cost[end] = new_cost[better]
+        node[end] = np.arange(first_node, len(parent))
+        live = np.insert(live, np.searchsorted(live, fresh), fresh)
+
+        # Élagage amorti : seulement quand le nombre d'états a doublé depuis le dernier
+        if prune and len(live) >= 2 * pruned:
+            live = prune_states(live, count, cost, next_releases[k])
+            pruned = max(len(live), PRUNE_MIN)
+
     # Meilleur résultat final
-    best_state = (0, float('inf'), [])
-    for state in dp.values():
-        cnt, cst, _ = state
-        best_cnt, best_cst, _ = best_state
-        if cnt > best_cnt:
-            best_state = state
-        elif cnt == best_cnt and cst < best_cst:
-            best_state = state
-            
-    final_count, final_cost, final_schedule = best_state
+    best_count = count.max()
+    candidates = np.flatnonzero(count == best_count)
+    best = candidates[np.argmin(cost[candidates])]
+    final_cost = float(cost[best]) if best_count > 0 else 0.0
+    leaf = int(node[best])
+
+    # Reconstruction du planning en remontant les noeuds
+    final_schedule = []
+    while leaf > 0:
+        task = node_task[leaf]
+        final_schedule.append((task, node_start[leaf], node_start[leaf] + task.p))
+        leaf = parent[leaf]
+    final_schedule.reverse()
+
     accepted = [x[0] for x in final_schedule]
-    rejected = [t for t in tasks if t not in accepted]
+    accepted_set = set(accepted)
+    rejected = [t for t in tasks if t not in accepted_set]
     
-    return final_schedule, accepted, rejected, final_cost
+    return ScheduleResult(
+        cost=final_cost,
+        completed=[t.id for t in accepted],
+        failed=[t.id for t in rejected],
+        makespan=max((end for _, _, end in final_schedule), default=0),
+        preemptions=0, # Non préemptif : une seule exécution par tâche
+        wall_time=time.perf_counter() - start_wall_time,
+        schedule=final_schedule,
+    )
 
 # --- 3. AFFICHAGE ---
 
 def plot_schedule(schedule_data, profile, accepted, rejected, P_PEAK):
+    import matplotlib.pyplot as plt # Importé seulement pour l'affichage
+
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 8), sharex=True, gridspec_kw={'height_ratios': [1, 2]})
     plt.subplots_adjust(hspace=0.2)
     
     # Prix
-    times_h = [t/60 for t in range(1441)]
-    prices_h = [profile.prices[t]*60 for t in range(1440)] + [profile.prices[1439]*60]
+    horizon = profile.horizon_min
+    times_h = [t/60 for t in range(horizon + 1)]
+    prices_h = [profile.prices[t]*60 for t in range(horizon)] + [profile.prices[horizon - 1]*60]
     
     ax1.step(times_h, prices_h, where='post', color='black', linewidth=1)
     ax1.fill_between(times_h, prices_h, step="post", alpha=0.2, color='gray')
@@ -139,8 +230,8 @@ def plot_schedule(schedule_data, profile, accepted, rejected, P_PEAK):
         ax2.set_yticklabels(job_ids)
     
     ax2.set_xlabel('Heures')
-    ax2.set_xlim(0, 24)
-    ax2.set_xticks(range(25))
+    ax2.set_xlim(0, horizon / 60)
+    ax2.set_xticks(range(0, horizon // 60 + 1, max(1, horizon // 1440)))
     ax2.grid(True, axis='x', linestyle=':', alpha=0.5)
     plt.tight_layout()
     plt.show()
@@ -166,7 +257,10 @@ def run_custom_scenario():
     ]
 
     # 3. Lancer l'algo
-    schedule, accepted, rejected, cost = solve_wan_qi_precision(tasks_list, profile)
+    result = solve_wan_qi_precision(tasks_list, profile)
+    schedule, cost = result.schedule, result.cost
+    accepted = [task for task, _, _ in schedule]
+    rejected = [t for t in tasks_list if t.id in result.failed]
 
     # 4. Résultats
     print(f"Coût Total : {cost:.2f}")
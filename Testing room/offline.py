@@ -0,0 +1,411 @@
+"""
+Optimum hors ligne préemptif.
+
+Les tâches peuvent être interrompues et reprises (comme dans greedy,
+rolling_horizon et online_full_tasks). Le temps est découpé en intervalles
+élémentaires : entre deux instants consécutifs parmi les arrivées, les
+deadlines et les changements de tarif, le prix est constant et l'ensemble des
+tâches disponibles ne change pas. Le coût minimum pour terminer un ensemble de
+tâches est alors un flot de coût minimum :
+
+    source -> tâche (capacité p) -> intervalle (capacité longueur, coût prix) -> puits
+
+avec un sommet par intervalle et non par minute.
+
+Le nombre de tâches terminées est maximisé d'abord (test de faisabilité EDF
+préemptif), puis le coût minimisé parmi les ensembles de taille maximale.
+Jusqu'à EXACT_LIMIT tâches, tous les ensembles de taille maximale sont
+comparés. Au-delà un seul est gardé (voir max_feasible_set) et le coût n'est
+qu'une borne : un autre ensemble de même taille peut coûter moins. La
+recherche exacte de cet ensemble n'est pas polynomiale : au-delà de
+STATE_BUDGET comparaisons d'états, elle s'arrête et l'ensemble rapide de
+greedy_feasible_set est gardé, le nombre de tâches n'étant alors lui aussi
+qu'une borne. Dans ces deux cas le résultat porte exact=False.
+"""
+
+import math
+import time
+from heapq import heappush, heappop
+
+from history import ExecutionHistory, as_segments
+from results import ScheduleResult
+from tariff import get_tariff
+
+INF = math.inf
+EXACT_LIMIT = 16 # Au-delà, un seul ensemble de taille maximale (voir max_feasible_sets)
+STATE_BUDGET = 500000 # Comparaisons d'états de max_feasible_set avant abandon (environ une seconde)
+
+
+def edf_conflict(jobs):
+    """
+    EDF préemptif sur jobs, liste (arrivée, durée, deadline) : il termine tout si
+    c'est possible. Renvoie None si tout est terminé, sinon (début, deadline) de
+    la fenêtre en surcharge : début de la période d'activité, deadline manquée.
+    """
+    events = sorted(jobs)
+    ready = [] # Tas (deadline, temps restant)
+    t, i, busy_start = 0, 0, 0
+    while i < len(events) or ready:
+        if not ready:
+            t = max(t, events[i][0])
+            busy_start = t
+        while i < len(events) and events[i][0] <= t:
+            r, p, d = events[i]
+            heappush(ready, [d, p])
+            i += 1
+        d, p = ready[0]
+        # Exécution jusqu'à la fin de la tâche ou la prochaine arrivée
+        end = t + p if i == len(events) else min(t + p, events[i][0])
+        if end > d:
+            return busy_start, d
+        ready[0][1] -= end - t
+        if ready[0][1] == 0:
+            heappop(ready)
+        t = end
+    return None
+
+
+def edf_feasible(jobs):
+    return edf_conflict(jobs) is None
+
+
+def deadline_order(jobs):
+    # Index par deadline croissante ; les tâches identiques sont consécutives dans cet ordre
+    return sorted(range(len(jobs)), key=lambda j: (jobs[j][2], jobs[j][0], jobs[j][1]))
+
+
+def greedy_feasible_set(jobs):
+    """
+    Ensemble terminable construit rapidement : tâches parcourues par deadline
+    croissante, la plus longue de la fenêtre en surcharge retirée quand
+    l'ensemble devient infaisable (Moore-Hodgson, exact sans dates d'arrivée).
+    Sert de borne inférieure à max_feasible_set.
+    """
+    chosen = []
+    for j in deadline_order(jobs):
+        chosen.append(j)
+        # On retire la plus longue tâche de la fenêtre en surcharge ; avec des
+        # dates d'arrivée, un seul retrait ne suffit pas toujours
+        conflict = edf_conflict([jobs[k] for k in chosen])
+        while conflict is not None:
+            start, deadline = conflict
+            window = [k for k in chosen if jobs[k][0] >= start and jobs[k][2] <= deadline] or chosen
+            chosen.remove(max(window, key=lambda k: jobs[k][1]))
+            conflict = edf_conflict([jobs[k] for k in chosen])
+    return sorted(chosen)
+
+
+def max_feasible_set(jobs, budget=STATE_BUDGET):
+    """
+    Un ensemble de taille maximale (index dans jobs) de tâches terminables ensemble, exact.
+    None après plus de `budget` comparaisons d'états (élimination des états dominés).
+
+    Les tâches sont ajoutées par deadline croissante : la dernière ajoutée, k, a la
+    plus faible priorité EDF et se termine à temps si et seulement si
+        fin[r_k] + p_k <= d_k
+    avec, pour chaque date d'arrivée r, fin[r] = max sur r' <= r de
+    (r' + durée des tâches choisies arrivées à partir de r'), la fin du travail
+    déjà choisi si les tâches arrivées après r étaient avancées à r.
+    Ajouter k ajoute p_k à fin[r] pour r <= r_k et porte fin[r] à au moins
+    fin[r_k] + p_k pour r > r_k.
+
+    L'état (tuple fin, restreint aux dates d'arrivée des tâches pas encore vues)
+    est gardé avec le plus grand nombre de tâches et un pointeur arrière vers la
+    dernière tâche ajoutée. Un état est écarté s'il est dominé (fins toutes plus
+    tardives et pas plus de tâches) ou s'il ne peut plus atteindre la taille de
+    greedy_feasible_set.
+    """
+    order = deadline_order(jobs)
+    lower = len(greedy_feasible_set(jobs))
+    # Dates d'arrivée encore à venir et nombre de tâches restantes par date
+    waiting = {}
+    for j in order:
+        waiting[jobs[j][0]] = waiting.get(jobs[j][0], 0) + 1
+    releases = sorted(waiting)
+    states = {tuple(releases): (0, None)} # fin -> (nombre de tâches, (tâche, pointeur précédent))
+
+    for step, j in enumerate(order):
+        r, p, d = jobs[j]
+        i = releases.index(r)
+        left = len(order) - step - 1 # Tâches encore à examiner après j
+        successors = {}
+
+        def keep(finish, count, node):
+            if count + left >= lower and (finish not in successors or successors[finish][0] < count):
+                successors[finish] = (count, node)
+
+        for finish, (count, node) in states.items():
+            keep(finish, count, node) # Tâche j écartée
+            end = finish[i] + p
+            if end <= d:
+                keep(tuple(f + p if x <= i else max(f, end) for x, f in enumerate(finish)), count + 1, (j, node))
+
+        # Date d'arrivée sans tâche restante : sa coordonnée ne sera plus lue
+        waiting[r] -= 1
+        if not waiting[r]:
+            del waiting[r]
+            releases.pop(i)
+            merged = {}
+            for finish, (count, node) in successors.items():
+                finish = finish[:i] + finish[i + 1:]
+                if finish not in merged or merged[finish][0] < count:
+                    merged[finish] = (count, node)
+            successors = merged
+
+        # Élimination des états dominés, du plus grand nombre de tâches au plus petit
+        kept = []
+        for finish, (count, node) in sorted(successors.items(), key=lambda item: (-item[1][0], item[0])):
+            budget -= len(kept) + 1
+            if budget < 0:
+                return None
+            if not any(c >= count and all(a <= b for a, b in zip(f, finish)) for f, (c, _) in kept):
+                kept.append((finish, (count, node)))
+        states = dict(kept)
+
+    count, node = max(states.values(), key=lambda state: state[0])
+    chosen = []
+    while node is not None:
+        j, node = node
+        chosen.append(j)
+    return sorted(chosen)
+
+
+def max_feasible_sets(jobs, exact_limit=EXACT_LIMIT, budget=STATE_BUDGET):
+    """
+    Ensembles de tâches (index dans jobs) de taille maximale terminables ensemble,
+    et True s'ils sont tous là (le coût minimum parmi eux est alors l'optimum).
+    Jusqu'à exact_limit tâches : tous, par séparation et évaluation ; des tâches
+    identiques étant interchangeables, un seul ensemble est rendu par choix de
+    tâches identiques. Au-delà : un seul ensemble, par max_feasible_set, ou par
+    greedy_feasible_set si le budget est dépassé.
+    """
+    if len(jobs) > exact_limit:
+        chosen = max_feasible_set(jobs, budget)
+        return [greedy_feasible_set(jobs) if chosen is None else chosen], False
+
+    order = deadline_order(jobs)
+    best = [[]]
+
+    def explore(k, chosen, skipped):
+        # skipped : dernière tâche écartée ; ses copies identiques qui suivent sont écartées aussi
+        if len(chosen) + len(order) - k < len(best[0]):
+            return # Même en prenant tout le reste, on ne rattrape pas
+        if k == len(order):
+            if len(chosen) > len(best[0]):
+                best[:] = [sorted(chosen)]
+            elif len(chosen) == len(best[0]):
+                best.append(sorted(chosen))
+            return
+        j = order[k]
+        if jobs[j] != skipped and edf_feasible([jobs[i] for i in chosen + [j]]):
+            explore(k + 1, chosen + [j], skipped)
+        explore(k + 1, chosen, jobs[j])
+
+    explore(0, [], None)
+    return best, True
+
+
+def elementary_intervals(jobs, tariff):
+    # Intervalles [début, fin) à prix constant entre arrivées, deadlines et changements de tarif
+    if not jobs:
+        return []
+    first = min(r for r, _, _ in jobs)
+    last = max(d for _, _, d in jobs)
+    cuts = {r for r, _, _ in jobs} | {d for _, _, d in jobs}
+    t = tariff.next_change(first)
+    while t < last:
+        cuts.add(t)
+        t = tariff.next_change(t)
+    cuts = sorted(cuts)
+    return [(a, b, tariff.price_at(a)) for a, b in zip(cuts, cuts[1:])]
+
+
+class MinCostFlow:
+    # Plus courts chemins successifs (Dijkstra avec potentiels), coûts positifs au départ
+
+    def __init__(self, n):
+        self.graph = [[] for _ in range(n)]
+
+    def add_edge(self, u, v, capacity, cost):
+        # Arête [destination, capacité, coût, index de l'arête inverse]
+        self.graph[u].append([v, capacity, cost, len(self.graph[v])])
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return self.graph[u][-1]
+
+    def solve(self, source, sink, demand):
+        # Envoie `demand` unités au coût minimum, renvoie (flot envoyé, coût)
+        n = len(self.graph)
+        potential = [0] * n
+        flow, cost = 0, 0
+        while flow < demand:
+            dist = [INF] * n
+            dist[source] = 0
+            previous = [None] * n # (sommet, index de l'arête)
+            heap = [(0, source)]
+            while heap:
+                d, u = heappop(heap)
+                if d > dist[u]:
+                    continue
+                for i, (v, capacity, c, _) in enumerate(self.graph[u]):
+                    nd = d + c + potential[u] - potential[v]
+                    if capacity > 0 and nd < dist[v] - 1e-12:
+                        dist[v] = nd
+                        previous[v] = (u, i)
+                        heappush(heap, (nd, v))
+            if dist[sink] == INF:
+                break
+            for v in range(n):
+                if dist[v] < INF:
+                    potential[v] += dist[v]
+
+            # Capacité résiduelle du chemin
+            push, v = demand - flow, sink
+            while v != source:
+                u, i = previous[v]
+                push = min(push, self.graph[u][i][1])
+                v = u
+            v = sink
+            while v != source:
+                u, i = previous[v]
+                edge = self.graph[u][i]
+                edge[1] -= push
+                self.graph[v][edge[3]][1] += push
+                cost += push * edge[2]
+                v = u
+            flow += push
+        return flow, cost
+
+
+def min_cost_allocation(jobs, tariff):
+    """
+    Coût minimum pour terminer toutes les tâches de jobs (préemptif), ou None si
+    c'est impossible. Renvoie (coût, {tâche: [(début, fin), ...]}).
+    """
+    intervals = elementary_intervals(jobs, tariff)
+    n, k = len(jobs), len(intervals)
+    source, sink = n + k, n + k + 1
+    flow = MinCostFlow(n + k + 2)
+    edges = []
+    for j, (r, p, d) in enumerate(jobs):
+        flow.add_edge(source, j, p, 0)
+        for i, (a, b, _) in enumerate(intervals):
+            if r <= a and b <= d:
+                edges.append((j, i, flow.add_edge(j, n + i, b - a, 0)))
+    for i, (a, b, price) in enumerate(intervals):
+        flow.add_edge(n + i, sink, b - a, price)
+
+    demand = sum(p for _, p, _ in jobs)
+    sent, cost = flow.solve(source, sink, demand)
+    if sent < demand:
+        return None
+
+    # Dans un intervalle, les parts des tâches s'enchaînent dans n'importe quel ordre
+    used = [0] * k
+    pieces = {j: [] for j in range(n)}
+    for j, i, edge in edges:
+        amount = (intervals[i][1] - intervals[i][0]) - edge[1]
+        if amount > 0:
+            start = intervals[i][0] + used[i]
+            pieces[j].append((start, start + amount))
+            used[i] += amount
+    return cost, pieces
+
+
+def solve_preemptive_optimum(tasks, tariff_model, accepted=None, exact_limit=EXACT_LIMIT, budget=STATE_BUDGET, verbose=True):
+    """
+    Optimum hors ligne préemptif : maximise le nombre de tâches terminées, puis
+    minimise le coût. Renvoie un ScheduleResult (historique dans result.history).
+    Au-delà de exact_limit tâches ou de budget comparaisons d'états (sans accepted), le résultat
+    n'est qu'une borne : result.exact vaut False.
+
+    tariff_model : modèle entier ou tarif construit (Tariff, PiecewiseTariff)
+    accepted : noms des tâches à terminer ; le coût est alors le minimum pour
+               terminer exactement celles-ci (pour les ratios compétitifs)
+    """
+    start_wall_time = time.perf_counter()
+    tariff = get_tariff(tariff_model)
+    tasks = list(tasks) # Liste de Task ou TaskSet
+    jobs = [(t.arrival_time, t.execution_time, t.deadline) for t in tasks]
+
+    if accepted is not None:
+        names = set(accepted)
+        candidates, exact = [[j for j, t in enumerate(tasks) if t.name in names]], True
+    else:
+        candidates, exact = max_feasible_sets(jobs, exact_limit, budget)
+
+    # Borne inférieure du coût d'un ensemble : chaque tâche au prix minimum de sa fenêtre.
+    # Ensembles examinés par borne croissante, arrêt dès que la borne atteint le meilleur coût
+    if len(candidates) > 1:
+        # (tâche de durée nulle : 0, pas 0 * INF quand sa fenêtre est vide)
+        floor = [p * tariff.min_price(r, d) if p else 0 for r, p, d in jobs]
+        candidates = sorted(candidates, key=lambda chosen: sum(floor[j] for j in chosen))
+    best = None
+    for chosen in candidates:
+        if best is not None and len(candidates) > 1 and sum(floor[j] for j in chosen) >= best[1]:
+            break
+        allocation = min_cost_allocation([jobs[j] for j in chosen], tariff)
+        if allocation is not None and (best is None or allocation[0] < best[1]):
+            best = (chosen, allocation[0], allocation[1])
+    if best is None:
+        raise ValueError("Les tâches acceptées ne peuvent pas toutes être terminées")
+    chosen, cost, pieces = best
+
+    # Historique : morceaux triés par début
+    runs = sorted((a, b, tasks[chosen[j]].name) for j, parts in pieces.items() for a, b in parts)
+    history = ExecutionHistory()
+    preemptions, finished = 0, set()
+    remaining = {tasks[j].name: tasks[j].execution_time for j in chosen}
+    previous = None
+    for a, b, name in runs:
+        t = a
+        while t < b:
+            # Un segment d'historique par période de prix constant
+            end = min(b, tariff.next_change(t))
+            history.append_run(t, end, name, tariff.price_at(t) * 60)
+            t = end
+        if previous is not None and previous != name and previous not in finished:
+            preemptions += 1
+        remaining[name] -= b - a
+        if remaining[name] == 0:
+            finished.add(name)
+        previous = name
+
+    chosen_set = set(chosen)
+    result = ScheduleResult(
+        cost=cost,
+        completed=[tasks[j].name for j in chosen],
+        failed=[t.name for j, t in enumerate(tasks) if j not in chosen_set],
+        makespan=max((b for _, b, _ in runs), default=0),
+        preemptions=preemptions,
+        wall_time=time.perf_counter() - start_wall_time,
+        history=history,
+        exact=exact,
+    )
+    if verbose:
+        if not exact:
+            print("Bound only (more than", exact_limit, "tasks or", budget, "state comparisons): the cost may not be minimal,",
+                  "nor the completed count past the state budget")
+        print("Total cost:", round(result.cost, 2))
+        print("Completed tasks:", result.completion_rate, "%")
+    return result
+
+
+def competitive_ratio(result, tasks, tariff_model):
+    # Coût de la politique / coût minimum pour terminer les mêmes tâches (préemptif)
+    # online_full_tasks peut terminer une tâche après sa deadline : la référence
+    # a alors jusqu'à la même fin réelle
+    # (la programmation dynamique, sans historique, respecte toujours les deadlines)
+    finish = {}
+    if result.history is not None:
+        for start, end, name, price in as_segments(result.history):
+            finish[name] = end
+    reference = []
+    for task in tasks:
+        if finish.get(task.name, 0) > task.deadline:
+            task = task.copy()
+            task.deadline = finish[task.name]
+        reference.append(task)
+    optimum = solve_preemptive_optimum(reference, tariff_model, accepted=result.completed, verbose=False)
+    if optimum.cost == 0:
+        return 1.0 if result.cost == 0 else INF
+    return result.cost / optimum.cost
@@ -0,0 +1,184 @@
+"""
+Diagramme de Gantt par segments.
+
+Tout le diagramme est dessiné comme une seule PolyCollection (une barre par
+segment de l'historique, une couleur par tâche), au lieu d'un artiste
+matplotlib par minute.
+Quand la fenêtre affichée est large, deux barres successives d'une même
+tâche sont fusionnées si elles sont proches (décimation) : le rendu dépend
+du nombre de segments visibles, pas du nombre de minutes. La décimation
+porte sur les segments de toute la machine, triés par début : une barre
+fusionnée ne recouvre jamais une autre tâche exécutée entre les deux.
+
+matplotlib n'est importé qu'au premier tracé : les modules d'ordonnancement
+s'importent sans lui. Avec output=<fichier>, la figure est une Figure
+indépendante de pyplot, enregistrée sans fenêtre au lieu d'être affichée
+(serveurs de calcul) : le backend de pyplot n'est jamais changé, il reste
+au choix de l'appelant (MPLBACKEND, matplotlib.use).
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from history import as_segments
+from tariff import get_tariff
+
+MAX_BARS = 2000 # Nombre de barres visé sur la largeur affichée
+MAX_LEGEND = 20 # Au-delà, la légende coûte plus cher que le diagramme
+
+
+def get_pyplot():
+    # Import de pyplot au premier tracé (backend choisi par matplotlib ou l'appelant)
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def new_figure(output=None, **kwargs):
+    # Figure pyplot pour l'affichage ; sans pyplot si elle est enregistrée dans output
+    if output is None:
+        return get_pyplot().figure(**kwargs)
+    from matplotlib.figure import Figure
+    return Figure(**kwargs)
+
+
+def finish(fig, output=None, tight=True):
+    # Affiche la figure, ou l'enregistre dans output (png, pdf, svg...)
+    if tight:
+        fig.tight_layout()
+    if output is None:
+        get_pyplot().show()
+    else:
+        fig.savefig(output)
+
+
+def decimate(segments, resolution):
+    # Fusionne deux segments (début, fin, tâche, prix) successifs de la même tâche séparés de moins de
+    # `resolution` minutes ; un segment d'une autre tâche entre les deux les garde séparés
+    if resolution <= 1:
+        return segments
+    merged = []
+    for start, end, task_name, price in segments:
+        if merged and merged[-1][2] == task_name and start - merged[-1][1] < resolution:
+            last_start, last_end, _, last_price = merged[-1]
+            merged[-1] = (last_start, max(last_end, end), task_name, max(last_price, price))
+        else:
+            merged.append((start, end, task_name, price))
+    return merged
+
+
+class GanttRenderer:
+    def __init__(self, ax, segments, max_bars=MAX_BARS):
+        self.ax = ax
+        self.max_bars = max_bars
+        self.collection = None
+
+        # Segments de toute la machine triés par début ; fins cumulées (max) pour la recherche
+        # des segments visibles, les historiques fusionnés de plusieurs machines se chevauchant
+        self.segments = sorted(segments)
+        self.starts = [s[0] for s in self.segments]
+        self.ends = list(accumulate((s[1] for s in self.segments), max))
+
+        from matplotlib import colormaps
+        names = list(dict.fromkeys(s[2] for s in self.segments)) # Ordre de première exécution
+        colors = colormaps['tab20'].resampled(max(len(names), 1))
+        self.task_colors = {name: colors(i) for i, name in enumerate(names)}
+
+    def draw(self, xmin, xmax):
+        from matplotlib.collections import PolyCollection
+
+        if self.collection is not None:
+            self.collection.remove()
+
+        # Une seule PolyCollection, une couleur par tâche
+        resolution = (xmax - xmin) / self.max_bars
+        verts, facecolors = [], []
+        # Seulement les segments visibles dans [xmin, xmax]
+        first = bisect_right(self.ends, xmin)
+        last = bisect_left(self.starts, xmax)
+        for start, end, name, price in decimate(self.segments[first:last], resolution):
+            verts.append([(start, 0), (start, price), (end, price), (end, 0)])
+            facecolors.append(self.task_colors[name])
+        self.collection = PolyCollection(verts, facecolors=facecolors, edgecolors='none')
+        self.ax.add_collection(self.collection)
+
+    def on_xlim_changed(self, ax):
+        self.draw(*ax.get_xlim())
+
+
+def plot_gantt(history, ax=None, max_bars=MAX_BARS, output=None):
+    # Sans ax, crée la figure puis l'affiche (ou l'enregistre dans output)
+    from matplotlib import ticker
+    import matplotlib.patches as mpatches
+
+    fig = None
+    if ax is None:
+        fig = new_figure(output, figsize=(24, 6))
+        ax = fig.subplots()
+
+    segments = as_segments(history) # Segments (début, fin, tâche, prix)
+    renderer = GanttRenderer(ax, segments, max_bars)
+
+    ax.set_ylim(0, max([s[3] for s in segments]) + 1)
+    ax.set_xlim(0, max([s[1] for s in segments]))
+    renderer.draw(*ax.get_xlim())
+    # Nouvelle décimation à chaque zoom
+    ax.callbacks.connect('xlim_changed', renderer.on_xlim_changed)
+    ax.gantt_renderer = renderer # Garde le renderer en vie avec l'axe
+
+    # Une graduation par heure sur 24h, plus espacées sur les longs plannings
+    span = ax.get_xlim()[1]
+    ax.xaxis.set_major_locator(ticker.MultipleLocator(60 * max(1, int(span / (24 * 60)))))
+    formatter = ticker.FuncFormatter(lambda x, pos: f'{int(x/60)}')
+    ax.xaxis.set_major_formatter(formatter)
+    ax.set_xlabel('Time')
+    ax.set_yticks([])
+
+    # Create legend
+    patches = [mpatches.Patch(color=color, label=task) for task, color in list(renderer.task_colors.items())[:MAX_LEGEND]]
+    ax.legend(handles=patches, bbox_to_anchor=(1.05, 1), loc='upper left')
+
+    if fig is not None:
+        finish(fig, output)
+
+
+def plot_cost_profile(tariff_model, max_hours=24, ax=None, output=None):
+    """
+    Affiche la courbe des coûts.
+    """
+    from matplotlib import ticker
+
+    fig = None
+    if ax is None:
+        fig = new_figure(output, figsize=(24, 4))
+        ax = fig.subplots()
+
+    # Prix par heure minute par minute, lu dans le tableau précalculé du modèle
+    tariff = get_tariff(tariff_model)
+    minutes = list(range(0, max_hours * 60))
+    costs = [tariff.price_at(m) * 60 for m in minutes]
+
+    ax.plot(minutes, costs, drawstyle='steps-post', color='tab:red', linewidth=2, label=f'Tariff Model {tariff_model}')
+
+    ax.set_ylim(0, 4)
+    ax.set_yticks([1, 2, 3])
+    ax.set_yticklabels(["Off (1)", "Mid (2)", "Peak (3)"])
+    ax.grid(True, linestyle='--', alpha=0.6)
+    ax.legend(loc='upper right') # Utiliser ax.legend
+
+    if fig is not None:
+        # Si on affiche seul, on formate l'axe X ici
+        ax.xaxis.set_major_locator(ticker.MultipleLocator(60))
+        formatter = ticker.FuncFormatter(lambda x, pos: f'{int(x/60)}h')
+        ax.xaxis.set_major_formatter(formatter)
+        finish(fig, output, tight=False)
+
+
+def plot_schedule(history, tariff_model, max_hours=24, output=None):
+    # Courbe des coûts au-dessus du diagramme de Gantt, sur le même axe des temps
+    fig = new_figure(output, figsize=(13, 8))
+    ax1, ax2 = fig.subplots(2, 1, sharex=True, gridspec_kw={'height_ratios': [1, 3]})
+    fig.subplots_adjust(hspace=0.1)
+
+    plot_cost_profile(tariff_model=tariff_model, max_hours=max_hours, ax=ax1) # Dessine en haut
+    plot_gantt(history, ax=ax2)
+    finish(fig, output, tight=False)
@@ -0,0 +1,488 @@
+"""
+Planification par réservation de créneaux.
+
+greedy(cost_opt=True) et online_full_tasks décident seulement « exécuter ou
+attendre cette minute » pour la tâche en tête. Ici chaque tâche active
+réserve les minutes libres les moins chères entre maintenant et sa deadline,
+et la machine exécute simplement les réservations.
+
+Structures :
+- FreeSlots : intervalles libres disjoints triés (bisect), pour trouver les
+  minutes libres d'une fenêtre sans parcourir les minutes une à une ;
+- Bookings : réservations (début, fin, tâche) triées par début, pour savoir
+  quelle tâche occupe l'instant courant, et MaxTree (arbre de segments sur
+  les débuts, deadline maximale par noeud) pour ne parcourir, dans une
+  fenêtre, que les réservations des tâches de deadline plus tardive ;
+- DeadlineTree : les tâches actives indexées par deadline, pour connaître
+  en O(log) les minutes déjà réservées et la plus longue tâche parmi les
+  deadlines inférieures ou égales à une date.
+
+Toutes les tâches actives sont déjà arrivées : leurs fenêtres [maintenant,
+deadline] sont emboîtées. Une tâche qui arrive prend, par prix croissant, les
+minutes libres de sa fenêtre (les plus tôt à prix égal, pour garder de la
+marge) ou, à prix égal, des minutes réservées par des tâches de deadline plus
+tardive. Seules ces tâches déplacées se replacent, pour les minutes perdues
+seulement et de la même façon (en cascade, deadline croissante) : les autres
+réservations ne bougent pas. Une tâche ne prenant jamais que des minutes de
+tâches plus tardives, elle trouve sa place tant que l'ensemble est faisable
+pour EDF. Sinon (ce que DeadlineTree détecte sans parcourir les
+réservations) la plus longue (temps restant) parmi les tâches de deadline
+inférieure ou égale est rejetée (règle de Moore-Hodgson) et la tâche réessaie.
+
+Les listes triées de FreeSlots et Bookings s'insèrent en O(n), mais par
+déplacement mémoire : en congestion (20 000 tâches), moins de 1 % du
+temps. Le temps partait dans les parcours de
+réservations, que MaxTree et DeadlineTree évitent (62 s avant, 34 s après).
+
+Limite, visible sur le DATASET B de benchmark.py (9.00 au lieu de 7.50) :
+une minute n'est laissée libre que pour une minute moins chère. À 7h, C1
+est seule et toute sa fenêtre est en heure pleine : elle s'exécute, puis
+l'arrivée de C2 la fait rejeter et la demi-heure déjà payée est perdue.
+Atteindre 7.50 demande de laisser la machine inactive sans gain de prix
+connu, ce qui en général fait perdre des tâches (une arrivée ultérieure ne
+trouve plus la place) : ce planificateur ne le fait pas.
+"""
+
+from bisect import bisect_left, bisect_right
+from heapq import heappush, heappop
+from itertools import count
+
+from engine import INF, Simulation
+from tariff import get_tariff
+
+
+class FreeSlots:
+    # Intervalles libres [début, fin) disjoints et triés, fusionnés quand ils se touchent
+
+    def __init__(self, start=0):
+        self.starts = [start]
+        self.ends = [INF]
+
+    def window(self, start, end):
+        # Morceaux libres dans [start, end)
+        i = bisect_right(self.ends, start)
+        while i < len(self.starts) and self.starts[i] < end:
+            yield max(self.starts[i], start), min(self.ends[i], end)
+            i += 1
+
+    def take(self, start, end):
+        # Occupe [start, end), qui doit être libre
+        i = bisect_right(self.starts, start) - 1
+        s, e = self.starts[i], self.ends[i]
+        pieces = [(a, b) for a, b in ((s, start), (end, e)) if a < b]
+        self.starts[i:i + 1] = [a for a, _ in pieces]
+        self.ends[i:i + 1] = [b for _, b in pieces]
+
+    def give(self, start, end):
+        # Libère [start, end), fusionné avec les intervalles voisins
+        i = bisect_left(self.starts, start)
+        if i > 0 and self.ends[i - 1] == start:
+            i -= 1
+            start = self.starts[i]
+            del self.starts[i], self.ends[i]
+        if i < len(self.starts) and self.starts[i] == end:
+            end = self.ends[i]
+            del self.starts[i], self.ends[i]
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def forget(self, now):
+        # Le passé ne sera plus réservé : intervalles finis avant now supprimés
+        k = bisect_right(self.ends, now)
+        del self.starts[:k], self.ends[:k]
+
+
+class MaxTree:
+    """
+    Arbre de segments creux sur des positions entières (minutes) : valeur par
+    position, maximum par noeud. first_above(lo, hi, seuil) trouve la première
+    position de [lo, hi) de valeur > seuil en ne descendant que dans les
+    noeuds dont le maximum dépasse le seuil.
+    """
+
+    def __init__(self):
+        self.size = 1 # Positions couvertes : [0, size)
+        self.tree = {} # Noeud -> maximum du sous-arbre
+
+    def set(self, position, value):
+        while position >= self.size:
+            self.grow()
+        i = self.size + position
+        self.tree[i] = value
+        self.update(i // 2)
+
+    def clear(self, position):
+        i = self.size + position
+        del self.tree[i]
+        self.update(i // 2)
+
+    def update(self, i):
+        # Recalcule les ancêtres à partir du noeud i ; un noeud sans feuille disparaît.
+        # Arrêt dès qu'un maximum ne change pas : ceux au-dessus non plus
+        while i:
+            a, b = self.tree.get(2 * i), self.tree.get(2 * i + 1)
+            value = b if a is None else a if b is None else max(a, b)
+            if self.tree.get(i) == value:
+                return
+            if value is None:
+                del self.tree[i]
+            else:
+                self.tree[i] = value
+            i //= 2
+
+    def grow(self):
+        # Deux fois plus de positions couvertes : les feuilles sont renumérotées
+        leaves = {i - self.size: value for i, value in self.tree.items() if i >= self.size}
+        self.size *= 2
+        self.tree = {}
+        for position, value in leaves.items():
+            self.tree[self.size + position] = value
+            self.update((self.size + position) // 2)
+
+    def first_above(self, lo, hi, threshold):
+        # Première position de [lo, hi) de valeur > threshold, None sinon
+        hi = min(hi, self.size)
+        stack = [(1, 0, self.size)] # (noeud, début, fin) à explorer, de gauche à droite
+        while stack:
+            i, a, b = stack.pop()
+            if b <= lo or hi <= a or self.tree.get(i, threshold) <= threshold:
+                continue
+            if b - a == 1:
+                return a
+            mid = (a + b) // 2
+            stack.append((2 * i + 1, mid, b))
+            stack.append((2 * i, a, mid))
+        return None
+
+
+class Bookings:
+    # Réservations [début, fin) -> tâche, triées par début (jamais de chevauchement)
+
+    def __init__(self):
+        self.starts = []
+        self.entries = [] # (début, fin, tâche)
+        self.deadlines = MaxTree() # Début -> deadline de la tâche réservée
+
+    def add(self, start, end, task):
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.entries.insert(i, (start, end, task))
+        self.deadlines.set(start, task.deadline)
+
+    def remove(self, start):
+        i = bisect_left(self.starts, start)
+        del self.starts[i], self.entries[i]
+        self.deadlines.clear(start)
+
+    def window(self, start, end):
+        # Réservations qui chevauchent [start, end), coupées à la fenêtre : (début, fin, tâche)
+        i = max(bisect_right(self.starts, start) - 1, 0)
+        while i < len(self.starts) and self.starts[i] < end:
+            s, e, task = self.entries[i]
+            if e > start:
+                yield max(s, start), min(e, end), task
+            i += 1
+
+    def later(self, start, end, deadline):
+        # Comme window, pour les seules tâches de deadline > deadline (sans parcourir les autres)
+        i = bisect_right(self.starts, start) - 1
+        if i >= 0:
+            s, e, task = self.entries[i]
+            if e > start and task.deadline > deadline:
+                yield start, min(e, end), task
+        position = self.deadlines.first_above(start + 1, end, deadline)
+        while position is not None:
+            s, e, task = self.entries[bisect_left(self.starts, position)]
+            yield s, min(e, end), task
+            position = self.deadlines.first_above(s + 1, end, deadline)
+
+    def cut(self, start, end):
+        # Retire [start, end) de la réservation qui le contient, renvoie celle-ci (début, fin, tâche)
+        i = bisect_right(self.starts, start) - 1
+        s, e, task = self.entries[i]
+        self.remove(s)
+        for a, b in ((s, start), (end, e)):
+            if a < b:
+                self.add(a, b, task)
+        return s, e, task
+
+    def at(self, t):
+        # (tâche, fin de sa réservation) à l'instant t, sinon (None, début de la prochaine réservation)
+        i = bisect_right(self.starts, t) - 1
+        if i >= 0 and self.entries[i][1] > t:
+            return self.entries[i][2], self.entries[i][1]
+        return None, self.starts[i + 1] if i + 1 < len(self.starts) else INF
+
+    def forget(self, now):
+        # Réservations exécutées (finies avant now) supprimées
+        k = bisect_right(self.starts, now)
+        while k > 0 and self.entries[k - 1][1] > now:
+            k -= 1
+        for start in self.starts[:k]:
+            self.deadlines.clear(start)
+        del self.starts[:k], self.entries[:k]
+
+
+class DeadlineTree:
+    """
+    Arbre de segments creux sur les deadlines (en minutes). Chaque noeud
+    donne, pour les tâches de son intervalle de deadlines : leur nombre, leurs
+    minutes réservées à venir et la plus longue (temps restant, la première
+    arrivée à égalité) ; prefix(d) les combine pour les deadlines <= d.
+    Les tâches de même deadline partagent une feuille (tas avec suppression
+    paresseuse).
+    """
+
+    EMPTY = (0, 0, (INF,))
+
+    def __init__(self):
+        self.size = 1 # Deadlines couvertes : [0, size)
+        self.tree = {} # Noeud -> (tâches, minutes réservées, (-temps restant, deadline, ordre, tâche))
+        self.groups = {} # Deadline -> [tâches, minutes réservées, tas (-temps restant, ordre, tâche)]
+        self.tasks = {} # Tâche -> [ordre d'arrivée, minutes réservées, temps restant dans le tas]
+
+    def set(self, task, booked, order=None):
+        # Ajoute task (avec son ordre d'arrivée) ou met à jour ses minutes réservées et son temps restant
+        while task.deadline >= self.size:
+            self.grow()
+        group = self.groups.setdefault(task.deadline, [0, 0, []])
+        if task not in self.tasks:
+            self.tasks[task] = [order, 0, None]
+            group[0] += 1
+        entry = self.tasks[task]
+        group[1] += booked - entry[1]
+        entry[1] = booked
+        if entry[2] != task.remaining_time:
+            entry[2] = task.remaining_time
+            heappush(group[2], (-task.remaining_time, entry[0], task))
+        self.refresh(task.deadline)
+
+    def remove(self, task):
+        group = self.groups[task.deadline]
+        group[0] -= 1
+        group[1] -= self.tasks.pop(task)[1]
+        self.refresh(task.deadline)
+
+    def refresh(self, deadline):
+        # Recalcule la feuille de deadline puis ses ancêtres
+        count, booked, heap = self.groups[deadline]
+        while heap and self.tasks.get(heap[0][2], (None, None, None))[2] != -heap[0][0]:
+            heappop(heap) # Tâche retirée ou temps restant périmé
+        i = self.size + deadline
+        if count:
+            rest, order, task = heap[0]
+            self.tree[i] = (count, booked, (rest, deadline, order, task))
+        else:
+            del self.groups[deadline]
+            self.tree.pop(i, None)
+        i //= 2
+        while i:
+            a, b = self.tree.get(2 * i, self.EMPTY), self.tree.get(2 * i + 1, self.EMPTY)
+            self.tree[i] = (a[0] + b[0], a[1] + b[1], min(a[2], b[2]))
+            i //= 2
+
+    def grow(self):
+        # Deux fois plus de deadlines couvertes : l'arbre est reconstruit
+        self.size *= 2
+        self.tree = {}
+        for deadline in list(self.groups):
+            self.refresh(deadline)
+
+    def prefix(self, deadline):
+        # (tâches, minutes réservées, plus longue tâche ou None) pour les deadlines <= deadline
+        count, booked, best = self.EMPTY
+        lo, hi = self.size, self.size + min(deadline, self.size - 1) + 1
+        while lo < hi:
+            if lo & 1:
+                node = self.tree.get(lo, self.EMPTY)
+                count, booked, best = count + node[0], booked + node[1], min(best, node[2])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                node = self.tree.get(hi, self.EMPTY)
+                count, booked, best = count + node[0], booked + node[1], min(best, node[2])
+            lo //= 2
+            hi //= 2
+        return count, booked, best[-1] if count else None
+
+    def __len__(self):
+        return self.tree.get(1, self.EMPTY)[0]
+
+
+class SlotPlanner:
+    """
+    Réservations des tâches actives. arrive(tâche, maintenant) réserve la
+    nouvelle tâche et renvoie les tâches rejetées ; at(t) donne la tâche à
+    exécuter.
+    """
+
+    def __init__(self, tariff):
+        self.tariff = tariff
+        self.free = FreeSlots()
+        self.bookings = Bookings()
+        self.pieces = {} # Tâche -> réservations [début, fin)
+        self.missing = {} # Tâche -> minutes qui lui restent à réserver
+        self.by_deadline = DeadlineTree() # Tâches actives par deadline (ordre d'arrivée à égalité)
+        self.counter = 0
+
+    def forget(self, now):
+        # Les réservations passées ont été exécutées : seules celles à partir de now comptent
+        self.free.forget(now)
+        self.bookings.forget(now)
+
+    def periods(self, start, end):
+        # Périodes à prix constant de [start, end), groupées par prix croissant : (prix, [(début, fin)])
+        groups = {}
+        t = start
+        while t < end:
+            stop = min(end, self.tariff.next_change(t))
+            groups.setdefault(self.tariff.price_at(t), []).append((t, stop))
+            t = stop
+        return sorted(groups.items())
+
+    def choose(self, task, now):
+        """
+        Minutes manquantes de task dans [now, deadline), par prix croissant : à
+        prix égal les minutes libres d'abord, puis celles des tâches de deadline
+        plus tardive. Renvoie [(début, fin, tâche déplacée ou None)], None s'il en manque.
+        Le parcours s'arrête dès que la tâche est complète.
+        """
+        need = self.missing[task]
+        count, booked, _ = self.by_deadline.prefix(task.deadline)
+        if booked + need > task.deadline - now:
+            return None # Même en prenant toutes les minutes des tâches plus tardives
+        chosen = []
+        # Aucune tâche plus tardive : inutile de parcourir les réservations
+        movable = len(self.by_deadline) > count
+        for price, spans in self.periods(now, task.deadline):
+            for a, b in spans:
+                for x, y in self.free.window(a, b):
+                    if need == 0:
+                        return chosen
+                    y = min(y, x + need)
+                    chosen.append((x, y, None))
+                    need -= y - x
+            for a, b in spans if movable else ():
+                for x, y, other in self.bookings.later(a, b, task.deadline):
+                    if need == 0:
+                        return chosen
+                    y = min(y, x + need)
+                    chosen.append((x, y, other))
+                    need -= y - x
+        return chosen if need == 0 else None
+
+    def book(self, task, chosen):
+        # Réserve les minutes choisies, renvoie les tâches déplacées
+        displaced = []
+        for x, y, other in chosen:
+            if other is None:
+                self.free.take(x, y)
+            else:
+                s, e, _ = self.bookings.cut(x, y)
+                spans = self.pieces[other]
+                spans.remove((s, e))
+                spans.extend((a, b) for a, b in ((s, x), (y, e)) if a < b)
+                self.missing[other] += y - x
+                self.by_deadline.set(other, other.remaining_time - self.missing[other])
+                displaced.append(other)
+            self.bookings.add(x, y, task)
+            self.pieces[task].append((x, y))
+        self.missing[task] = 0
+        self.by_deadline.set(task, task.remaining_time)
+        return displaced
+
+    def release(self, task, now):
+        # Rend les minutes réservées (à partir de now) de la tâche
+        for a, b in self.pieces.pop(task, []):
+            if b <= now:
+                continue
+            self.bookings.remove(a)
+            self.free.give(max(a, now), b) # Réservation en cours : la partie passée a été exécutée
+
+    def unlist(self, task):
+        self.missing.pop(task, None)
+        self.by_deadline.remove(task)
+
+    def drop(self, task, now):
+        self.release(task, now)
+        self.unlist(task)
+
+    def arrive(self, task, now):
+        # Réservation de la nouvelle tâche, puis des seules tâches dont elle a pris des minutes
+        if now + task.remaining_time > task.deadline:
+            return [task] # Impossible même seule
+        self.forget(now)
+        self.counter += 1
+        self.by_deadline.set(task, 0, self.counter)
+        self.pieces[task] = []
+        self.missing[task] = task.remaining_time
+
+        rejected = []
+        order = count()
+        waiting = [(task.deadline, next(order), task)] # Tâches à compléter, par deadline croissante
+        while waiting:
+            t = heappop(waiting)[-1]
+            if self.missing.get(t, 0) == 0:
+                continue # Rejetée ou déjà complétée
+            chosen = self.choose(t, now)
+            if chosen is None:
+                # Plus longue tâche parmi celles de deadline <= celle de t (Moore-Hodgson)
+                victim = self.by_deadline.prefix(t.deadline)[2]
+                self.drop(victim, now)
+                rejected.append(victim)
+                if victim is not t:
+                    heappush(waiting, (t.deadline, next(order), t))
+                continue
+            for other in self.book(t, chosen):
+                heappush(waiting, (other.deadline, next(order), other))
+        return rejected
+
+    def ran(self, task):
+        # task vient de s'exécuter : ses minutes réservées à venir ont diminué d'autant
+        if task.remaining_time == 0:
+            self.finish(task)
+        else:
+            self.by_deadline.set(task, task.remaining_time - self.missing[task])
+
+    def finish(self, task):
+        # Tâche terminée : toutes ses réservations ont été exécutées
+        self.pieces.pop(task, None)
+        self.unlist(task)
+
+    def at(self, t):
+        return self.bookings.at(t)
+
+
+def slot_reservation(tasks_list, tariff_model=2, verbose=True):
+    #Ordonnancement par réservation des minutes les moins chères
+    #Renvoie un ScheduleResult (historique dans result.history)
+
+    sim = Simulation(tasks_list, get_tariff(tariff_model))
+    planner = SlotPlanner(sim.tariff)
+
+    while sim.has_pending() or sim.active:
+        t = sim.current_time
+        for task in sim.admit():
+            # Tâches rejetées : elles ne pourraient pas toutes finir avant leur deadline
+            for rejected in planner.arrive(task, t):
+                sim.failed.append(rejected)
+                sim.active.remove(rejected)
+                sim.latest_starts.remove(rejected)
+
+        task, end = planner.at(t)
+        end = min(end, sim.next_arrival())
+        if task is not None:
+            end = min(end, t + task.remaining_time, sim.tariff.next_change(t))
+            sim.execute(task, end)
+            planner.ran(task)
+        else:
+            sim.skip(end if end < INF else t + 1)
+
+    result = sim.result()
+    if verbose:
+        print("Simulation completed in", result.wall_time, "seconds.")
+        print("End time:", round(sim.current_time/60,2), "hours")
+        print("Total cost:", round(sim.total_cost,2))
+        print("Completed tasks:", len(sim.completed)/sim.total_initial * 100, "%")
+
+    return result
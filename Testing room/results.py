@@ -0,0 +1,52 @@
+class ScheduleResult:
+    """
+    Résultat compact d'un ordonnancement, renvoyé par les algorithmes.
+
+    cost : coût total
+    completed / failed : noms des tâches terminées / échouées (ou rejetées)
+    makespan : fin de la dernière minute exécutée (minutes)
+    preemptions : nombre d'interruptions d'une tâche commencée et non terminée
+    wall_time : durée de la simulation (secondes)
+    history : historique pour le diagramme de Gantt (algorithmes en ligne)
+    schedule : liste (tâche, début, fin) (programmation dynamique)
+    histories : un historique par machine (mode multi-machines, voir multi.py)
+    exact : False si le résultat n'est qu'une borne de l'optimum (voir offline.py)
+    """
+
+    def __init__(self, cost, completed, failed, makespan, preemptions, wall_time, history=None, schedule=None, histories=None, exact=True):
+        self.cost = cost
+        self.completed = completed
+        self.failed = failed
+        self.makespan = makespan
+        self.preemptions = preemptions
+        self.wall_time = wall_time
+        self.history = history
+        self.schedule = schedule
+        self.histories = histories
+        self.exact = exact
+
+    @property
+    def total(self):
+        return len(self.completed) + len(self.failed)
+
+    @property
+    def completion_rate(self):
+        # Pourcentage de tâches terminées
+        return len(self.completed) / self.total * 100 if self.total else 0.0
+
+    def as_dict(self):
+        # Champs agrégeables, sans l'historique
+        return {
+            "cost": self.cost,
+            "completed": list(self.completed),
+            "failed": list(self.failed),
+            "makespan": self.makespan,
+            "preemptions": self.preemptions,
+            "wall_time": self.wall_time,
+            "completion_rate": self.completion_rate,
+            "exact": self.exact,
+        }
+
+    def __repr__(self):
+        return (f"ScheduleResult(cost={self.cost:.2f}, completed={len(self.completed)}/{self.total}, "
+                f"makespan={self.makespan}, preemptions={self.preemptions})")
@@ -0,0 +1,180 @@
+"""
+Ordonnanceur en service asyncio, cadencé par l'horloge murale.
+
+Une seule boucle d'événements : la tâche run() prend une décision (même
+moteur que stream.py), émet les événements correspondants puis dort jusqu'à
+la fin prévue du segment, ou jusqu'à une soumission qui l'interrompt. Le
+segment n'est appliqué qu'au réveil, jusqu'à l'instant atteint.
+
+Temps simulé en minutes ; speed = minutes simulées par seconde réelle
+(REAL_TIME pour le temps réel, plus grand pour accélérer).
+
+Événements (dans service.events, une asyncio.Queue) :
+
+    ("dispatch", instant, tâche)       la machine commence / reprend la tâche
+    ("preempt", instant, tâche)        la tâche est interrompue sans être terminée
+    ("run", début, fin, tâche, prix)   segment exécuté (coût), émis quand il ne peut
+                                       plus s'allonger
+    ("completed", instant, tâche)
+    ("failed", instant, tâche)
+
+Chaque décision coûte O(log n) (tas de stream.StreamSimulation) ; sa durée
+est mesurée dans service.latencies (secondes). Avec 50 000 tâches en attente
+(python service.py), le 99e centile reste sous 0,3 ms ; les rares pointes de
+quelques ms sont les compactages des tas (ReadyQueue.remove), amortis.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+
+from engine import INF
+from stream import KEEP, make_stream
+
+REAL_TIME = 1 / 60 # Une minute simulée par minute réelle
+LATENCY_SAMPLES = 10000 # Nombre de mesures de latence gardées
+
+
+class SchedulerService:
+    def __init__(self, rule, tariff_model=2, strategy="EDF", speed=REAL_TIME, start=0, keep=KEEP):
+        """
+        rule : règle par tâche (task2.greedy_rule(cost_opt), task2.RollingPlan(), Tasks.online_rule) ;
+               un RollingPlan déjà utilisé ailleurs relit son cache tarifaire au besoin
+        start : instant simulé (minutes) au lancement de run()
+        """
+        self.sim = make_stream(rule, tariff_model, strategy, keep)
+        self.sim.current_time = start
+        self.speed = speed
+        self.start = start
+        self.origin = None # Heure de la boucle au lancement
+        self.events = asyncio.Queue()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.running = None # Tâche en cours d'exécution sur la machine
+        self.closed = False
+        self.wakeup = asyncio.Event()
+
+    def now(self):
+        # Instant simulé (minutes, non arrondi)
+        if self.origin is None:
+            return self.start
+        return self.start + (asyncio.get_running_loop().time() - self.origin) * self.speed
+
+    def submit(self, task):
+        # Soumission depuis la même boucle : la tâche arrive au plus tôt maintenant
+        if self.closed:
+            raise RuntimeError("Le service n'accepte plus de tâches")
+        task = task.copy()
+        task.arrival_time = max(task.arrival_time, math.floor(self.now()))
+        self.sim.push(task)
+        self.wakeup.set()
+
+    def close(self):
+        # Plus de soumissions ; run() se termine une fois les tâches reçues traitées
+        self.closed = True
+        self.wakeup.set()
+
+    def emit(self, event):
+        self.events.put_nowait(event)
+
+    def stop_running(self, t):
+        # Interruption de la tâche en cours si elle n'est pas terminée
+        if self.running is not None and self.running.remaining_time > 0 and self.running in self.sim.active:
+            self.emit(("preempt", t, self.running.name))
+        self.running = None
+
+    async def sleep_until(self, minute):
+        # Attend l'instant simulé `minute` ou une soumission ; True si l'instant est atteint
+        # (wakeup est remis à zéro par run() avant de lire l'état, jamais ici : un close() reste vu)
+        delay = None if minute == INF else max(0.0, (minute - self.now()) / self.speed)
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            return True
+        return False
+
+    async def run(self):
+        # Boucle du service, renvoie le résumé (ScheduleResult) après close()
+        sim = self.sim
+        self.origin = asyncio.get_running_loop().time()
+        while not self.closed or sim.incoming or sim.active:
+            self.wakeup.clear() # Les soumissions et close() d'avant sont vus par plan() ci-dessous
+            decided = time.perf_counter()
+            task, execute, end = sim.plan()
+            t = sim.current_time
+            switch = task is not self.running if execute else self.running is not None
+            # Changement de tâche : le dernier "run" gardé par drain() est terminé
+            for event in sim.drain(hold=not switch):
+                self.emit(event)
+            if switch:
+                self.stop_running(t)
+                if execute:
+                    self.running = task
+                    self.emit(("dispatch", t, task.name))
+            self.latencies.append(time.perf_counter() - decided)
+
+            if end <= t and not sim.active:
+                if self.closed and not sim.incoming:
+                    break # Dernières tâches (durée nulle, deadline dépassée) traitées à l'admission
+                end = INF # Rien à faire avant la prochaine soumission
+            reached = await self.sleep_until(end)
+
+            # Application du segment jusqu'à l'instant atteint
+            stop = end if reached else min(end, max(t, math.floor(self.now())))
+            if stop > t and stop != INF:
+                sim.apply(task, execute, stop)
+            if self.running is not None and self.running.remaining_time == 0:
+                self.running = None
+            for event in sim.drain():
+                self.emit(event)
+
+        for event in sim.drain(hold=False):
+            self.emit(event)
+        return sim.result()
+
+    def latency_stats(self):
+        # (moyenne, 99e centile, maximum) des latences de décision, en millisecondes
+        if not self.latencies:
+            return 0.0, 0.0, 0.0
+        samples = sorted(self.latencies)
+        p99 = samples[min(len(samples) - 1, int(0.99 * len(samples)))]
+        return sum(samples) / len(samples) * 1000, p99 * 1000, samples[-1] * 1000
+
+
+async def submit_all(service, tasks, interval=0.0):
+    # Soumetteur local : envoie les tâches une par une (interval secondes entre deux)
+    for task in tasks:
+        service.submit(task)
+        await asyncio.sleep(interval)
+    service.close()
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+
+    from task2 import greedy_rule
+    from workload import Task
+
+    # python service.py [nombre de tâches] : latence avec des dizaines de milliers de tâches en attente
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+    tasks = []
+    for i in range(n):
+        arrival = rng.uniform(0, 2)
+        execution = rng.uniform(0.01, 0.2)
+        tasks.append(Task(f"J{i}", arrival, execution, arrival + execution + rng.uniform(0, 400)))
+
+    async def main():
+        service = SchedulerService(greedy_rule(True), speed=6000) # 100 h simulées par seconde
+        runner = asyncio.create_task(service.run())
+        await submit_all(service, tasks)
+        dispatched = 0
+        result = await runner
+        while not service.events.empty():
+            dispatched += service.events.get_nowait()[0] == "dispatch"
+        mean, p99, worst = service.latency_stats()
+        print(f"{n} tâches, {dispatched} dispatch, coût {result.cost:.2f}")
+        print(f"Latence par décision : moyenne {mean:.3f} ms, p99 {p99:.3f} ms, max {worst:.3f} ms")
+
+    asyncio.run(main())
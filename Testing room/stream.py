@@ -0,0 +1,257 @@
+"""
+Ordonnancement en ligne sur un flux de tâches.
+
+Les algorithmes de task2.py et Tasks.py reçoivent la liste complète des
+tâches avant de commencer. Ici les tâches sont poussées pendant la
+simulation (générateur, asyncio.Queue ou fichier suivi comme tail -f) et les
+décisions sont renvoyées au fur et à mesure, sous forme d'événements :
+
+    ("run", début, fin, tâche, prix)   exécution de la tâche sur [début, fin)
+                                       émis quand il ne peut plus s'allonger
+                                       (mêmes segments que ExecutionHistory)
+    ("completed", instant, tâche)
+    ("failed", instant, tâche)         tâche condamnée (laxité < 0)
+
+Le flux doit être (à peu près) trié par date d'arrivée : recevoir une tâche
+d'arrivée t garantit qu'aucune tâche n'arrivera avant t, et la simulation
+avance jusqu'à t. Une tâche reçue en retard (arrivée déjà dépassée) est
+admise à l'instant courant.
+
+La mémoire reste bornée : l'historique n'est pas conservé (les événements
+sont rendus à l'appelant), seules les `keep` dernières tâches terminées ou
+échouées sont gardées, et les files ne contiennent que les tâches actives.
+
+La politique est une règle par tâche comme pour engine.head_policy :
+task2.greedy_rule(cost_opt), task2.RollingPlan() ou Tasks.online_rule. Un
+RollingPlan garde un cache de la période tarifaire, relu dès que le temps en
+sort : la même instance peut servir à plusieurs flux successifs.
+"""
+
+import time
+from collections import deque
+from heapq import heappush, heappop
+
+from engine import INF, Simulation, head_policy
+from results import ScheduleResult
+from tariff import get_tariff
+from workload import Task
+
+KEEP = 1000 # Nombre de tâches terminées / échouées gardées pour le résultat
+
+
+class EventSink:
+    """
+    Remplace l'historique : chaque exécution devient un événement "run". Le
+    dernier run peut encore s'allonger (même tâche, même prix) : il reste hors
+    de la liste des événements, même entre deux drain(), jusqu'à ce qu'un autre
+    run commence ou que sa tâche se termine / échoue.
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.open = None # Dernier run, pas encore émis
+
+    def append_run(self, start, end, task_name, price):
+        if end <= start:
+            return
+        last = self.open
+        if last is not None and last[2] == start and last[3] == task_name and last[4] == price:
+            self.open = ("run", last[1], end, task_name, price)
+            return
+        self.close()
+        self.open = ("run", start, end, task_name, price)
+
+    def append(self, event):
+        # Événement "completed" / "failed" : le run de la même tâche est terminé avant lui
+        if self.open is not None and self.open[3] == event[2]:
+            self.close()
+        self.events.append(event)
+
+    def close(self):
+        if self.open is not None:
+            self.events.append(self.open)
+            self.open = None
+
+
+class Outcomes:
+    # Remplace les listes completed / failed : compte tout, garde les `keep` derniers noms
+
+    def __init__(self, sim, kind, keep):
+        self.sim = sim
+        self.kind = kind
+        self.count = 0
+        self.recent = deque(maxlen=keep)
+
+    def append(self, task):
+        self.count += 1
+        self.recent.append(task.name)
+        self.sim.history.append((self.kind, self.sim.current_time, task.name))
+
+    def __len__(self):
+        return self.count
+
+
+class StreamSimulation(Simulation):
+    """
+    Simulation alimentée au fil de l'eau : push() ajoute une tâche, advance(t)
+    prend les décisions jusqu'à t, drain() rend les événements produits.
+    """
+
+    def __init__(self, tariff, decide, strategy="EDF", keep=KEEP):
+        self.decide = decide
+        self.keep = keep
+        super().__init__([], tariff, strategy)
+
+    def reset(self, tariff=None, strategy=None):
+        super().reset(tariff, strategy)
+        self.incoming = [] # Tas (arrivée, ordre de réception, tâche) des tâches pas encore arrivées
+        self.received = 0
+        self.total_initial = 0
+        self.horizon = 0 # Toutes les arrivées avant cet instant sont connues
+        self.events = []
+        self.history = EventSink(self.events)
+        self.completed = Outcomes(self, "completed", self.keep)
+        self.failed = Outcomes(self, "failed", self.keep)
+        return self
+
+    def push(self, task):
+        # La Task reçue n'est pas modifiée : la simulation travaille sur une copie
+        task = task.copy()
+        task.remaining_time = task.execution_time
+        task.arrival_time = max(task.arrival_time, self.current_time)
+        self.received += 1
+        self.total_initial += 1
+        heappush(self.incoming, (task.arrival_time, self.received, task))
+
+    def has_pending(self):
+        return bool(self.incoming)
+
+    def next_arrival(self):
+        return self.incoming[0][0] if self.incoming else INF
+
+    def admit(self):
+        new_arrivals = []
+        while self.incoming and self.incoming[0][0] <= self.current_time:
+            task = heappop(self.incoming)[-1]
+            if self.enqueue(task):
+                new_arrivals.append(task)
+        return new_arrivals
+
+    def plan(self):
+        """
+        Admissions et tâches condamnées à l'instant courant, puis décision :
+        (tâche, exécuter ?, fin du segment pendant lequel la décision reste valable).
+        Sans tâche active, tâche = None et fin = prochaine arrivée (l'instant
+        courant si rien n'est attendu).
+        """
+        new_arrivals = self.admit()
+        self.drop_missed(new_arrivals)
+
+        t = self.current_time
+        if not self.active:
+            return None, False, self.next_arrival() if self.incoming else t
+        task, execute, end = self.decide(self)
+        end = min(end, self.next_arrival(), self.next_miss(task if execute else None))
+        if execute:
+            end = min(end, t + task.remaining_time, self.tariff.next_change(t))
+        return task, execute, end
+
+    def apply(self, task, execute, end):
+        # Applique la décision de plan() jusqu'à end (éventuellement avant la fin prévue)
+        if execute:
+            self.execute(task, end)
+        elif end > self.current_time:
+            self.skip(end)
+
+    def advance(self, until=INF):
+        """
+        Décisions jusqu'à `until` (INF : jusqu'à épuisement des tâches reçues).
+        Même boucle que engine.run_policy, arrêtée à l'horizon connu.
+        """
+        self.horizon = max(self.horizon, until)
+        while self.current_time < self.horizon and (self.incoming or self.active):
+            task, execute, end = self.plan()
+            self.apply(task, execute, min(end, self.horizon))
+        return self
+
+    def drain(self, hold=True):
+        # Événements produits depuis le dernier appel ; hold=False rend aussi le run encore ouvert
+        if not hold:
+            self.history.close()
+        events = self.events[:]
+        self.events.clear()
+        return events
+
+    def result(self):
+        # Résumé : seules les `keep` dernières tâches terminées / échouées sont nommées
+        return ScheduleResult(
+            cost=self.total_cost,
+            completed=list(self.completed.recent),
+            failed=list(self.failed.recent),
+            makespan=self.makespan,
+            preemptions=self.preemptions,
+            wall_time=time.perf_counter() - self.start_wall_time,
+        )
+
+
+def make_stream(rule, tariff_model=2, strategy="EDF", keep=KEEP):
+    return StreamSimulation(get_tariff(tariff_model), head_policy(rule, strategy), strategy, keep)
+
+
+def stream(source, rule, tariff_model=2, strategy="EDF", keep=KEEP):
+    """
+    Générateur d'événements à partir d'un itérable de Task (éventuellement infini).
+    Les décisions jusqu'à l'arrivée d'une tâche sont rendues dès qu'elle est reçue.
+    """
+    sim = make_stream(rule, tariff_model, strategy, keep)
+    for task in source:
+        sim.advance(task.arrival_time)
+        sim.push(task)
+        yield from sim.drain()
+    sim.advance()
+    yield from sim.drain(hold=False)
+
+
+async def stream_queue(queue, rule, tariff_model=2, strategy="EDF", keep=KEEP):
+    # Même chose à partir d'une asyncio.Queue de Task ; None termine le flux
+    sim = make_stream(rule, tariff_model, strategy, keep)
+    while True:
+        task = await queue.get()
+        if task is None:
+            break
+        sim.advance(task.arrival_time)
+        sim.push(task)
+        for event in sim.drain():
+            yield event
+    sim.advance()
+    for event in sim.drain(hold=False):
+        yield event
+
+
+def parse_task(line):
+    # Ligne "nom,arrivée,durée,deadline" (heures, comme le constructeur de Task)
+    name, arrival, execution, deadline = line.strip().split(",")
+    return Task(name, float(arrival), float(execution), float(deadline))
+
+
+def tail_tasks(path, follow=True, poll=0.5):
+    """
+    Tâches lues dans un fichier texte (une par ligne, voir parse_task) au fur et
+    à mesure qu'il est écrit. follow=False : s'arrête à la fin du fichier.
+    Les lignes vides et les commentaires (#) sont ignorés.
+    """
+    with open(path) as f:
+        partial = ""
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    break
+                time.sleep(poll)
+                continue
+            partial += line
+            if not partial.endswith("\n") and follow:
+                continue # Ligne en cours d'écriture
+            line, partial = partial.strip(), ""
+            if line and not line.startswith("#"):
+                yield parse_task(line)
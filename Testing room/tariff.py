@@ -0,0 +1,249 @@
+"""
+Tarification TOU (Time Of Use) précalculée.
+
+Le prix de chaque minute est calculé une seule fois par tariff_model, avec
+les sommes préfixes (coût d'un intervalle en O(1)), la liste des instants de
+changement de prix et l'index de la prochaine période moins chère.
+
+PiecewiseTariff couvre les horizons de plusieurs jours : le tarif est stocké
+comme une suite d'intervalles à prix constant (pas un prix par minute),
+éventuellement répétée avec une période (jour, semaine, année...). Les
+requêtes (prix, coût, prochain changement, prochaine minute moins chère) sont
+en O(log k) pour k intervalles. calendar_tariff construit un tarif jour par
+jour (semaine / week-end, saisons) à partir des modèles journaliers.
+"""
+
+import math
+import numbers
+from bisect import bisect_right
+
+INF = math.inf
+DAY = 24 * 60 # Horizon du tableau de prix en minutes
+
+
+def hourly_price(hour, tariff_model):
+    # Prix par heure à l'heure `hour`
+
+    if tariff_model == 2:
+        #7h-11h & 17h-21h: Peak, autres: OffPeak
+        if 7 <= hour < 11 or 17 <= hour < 21:
+            return 3 # Peak
+        return 1 # OffPeak
+
+    # 0h-7h: OffPeak, 7h-11h: MidPeak, 11h-17h: Peak, 17h-20h: MidPeak, 20h-24h: OffPeak
+    if 11 <= hour < 17:
+        return 3 # Peak
+    if 7 <= hour < 11 or 17 <= hour < 20:
+        return 2 # MidPeak
+    return 1 # OffPeak
+
+
+def cheapest_period(tariff, start, end):
+    # (prix minimum, première minute où il est atteint) sur [start, end), parcours des périodes à prix constant
+    best = (INF, None)
+    t = start
+    while t < end:
+        price = tariff.price_at(t)
+        if price < best[0]:
+            best = (price, t)
+            if price == tariff.lowest:
+                break
+        t = tariff.next_change(t)
+    return best
+
+
+class Tariff:
+    def __init__(self, tariff_model, horizon=DAY):
+        self.tariff_model = tariff_model
+        self.horizon = horizon
+
+        # Prix par minute sur [0, horizon), constant (tail) au-delà
+        self.prices = [hourly_price(round(m/60, 2), tariff_model)/60 for m in range(horizon)]
+        self.tail = hourly_price(horizon/60, tariff_model)/60
+
+        # prefix[t] = coût d'exécution sur [0, t)
+        self.prefix = [0]
+        for price in self.prices:
+            self.prefix.append(self.prefix[-1] + price)
+
+        # Instants où le prix change
+        self.breakpoints = [m for m in range(1, horizon) if self.prices[m] != self.prices[m - 1]]
+        if self.tail != self.prices[-1]:
+            self.breakpoints.append(horizon)
+
+        prices = self.prices
+        self.lowest = min(min(prices), self.tail) # Arrêt anticipé de cheapest
+
+        # next_lower[i] = première minute j > i avec un prix strictement plus bas (pile monotone)
+        self.next_lower = [INF] * horizon
+        stack = []
+        for j in range(horizon):
+            while stack and prices[j] < prices[stack[-1]]:
+                self.next_lower[stack.pop()] = j
+            stack.append(j)
+        for i in stack:
+            if self.tail < prices[i]:
+                self.next_lower[i] = horizon
+
+    def price_at(self, t):
+        # Prix par minute à l'instant t
+        return self.prices[t] if t < self.horizon else self.tail
+
+    def _cumulative(self, t):
+        if t <= self.horizon:
+            return self.prefix[t]
+        return self.prefix[self.horizon] + (t - self.horizon) * self.tail
+
+    def cost(self, start, end):
+        # Coût d'exécution sur [start, end)
+        return self._cumulative(end) - self._cumulative(start)
+
+    def cheapest(self, start, end):
+        # (prix minimum, première minute où il est atteint) sur [start, end)
+        return cheapest_period(self, start, end)
+
+    def min_price(self, start, end):
+        # Prix minimum sur [start, end), INF si l'intervalle est vide
+        return self.cheapest(start, end)[0]
+
+    def next_cheaper(self, t):
+        # Première minute > t où le prix est strictement plus bas qu'à t, INF sinon
+        return self.next_lower[t] if t < self.horizon else INF
+
+    def next_change(self, t):
+        # Premier instant > t où le prix change, INF s'il n'y en a plus
+        i = bisect_right(self.breakpoints, t)
+        return self.breakpoints[i] if i < len(self.breakpoints) else INF
+
+
+class PiecewiseTariff:
+    def __init__(self, starts, prices, period=None):
+        """
+        starts : débuts des intervalles en minutes (croissants, le premier vaut 0)
+        prices : prix par minute de chaque intervalle
+        period : longueur de la période en minutes (le tarif se répète), None sinon :
+                 le dernier prix vaut alors jusqu'à l'infini
+        """
+        # Fusion des intervalles voisins de même prix
+        self.starts, self.prices = [], []
+        for start, price in zip(starts, prices):
+            if self.prices and self.prices[-1] == price:
+                continue
+            self.starts.append(start)
+            self.prices.append(price)
+        self.period = period
+        self.lowest = min(self.prices)
+        k = len(self.starts)
+
+        # cumulative[i] = coût sur [0, starts[i]), period_cost = coût d'une période
+        self.cumulative = [0]
+        for i in range(1, k):
+            self.cumulative.append(self.cumulative[-1] + (self.starts[i] - self.starts[i - 1]) * self.prices[i - 1])
+        self.period_cost = self.cumulative[-1] + (period - self.starts[-1]) * self.prices[-1] if period else INF
+
+        # next_lower[i] = début du premier intervalle suivant de prix strictement plus bas
+        # (relatif au début de la période de l'intervalle i), sur deux périodes si le tarif se répète
+        extended = [(s, p) for s, p in zip(self.starts, self.prices)]
+        if period:
+            extended += [(s + period, p) for s, p in zip(self.starts, self.prices)]
+        self.next_lower = [INF] * len(extended)
+        stack = []
+        for j, (start, price) in enumerate(extended):
+            while stack and price < extended[stack[-1]][1]:
+                self.next_lower[stack.pop()] = start
+            stack.append(j)
+        self.next_lower = self.next_lower[:k]
+
+    def _locate(self, t):
+        # (début de la période, index de l'intervalle, position dans la période)
+        if self.period:
+            base, offset = divmod(t, self.period)
+            base *= self.period
+        else:
+            base, offset = 0, t
+        return base, bisect_right(self.starts, offset) - 1, offset
+
+    def price_at(self, t):
+        # Prix par minute à l'instant t
+        return self.prices[self._locate(t)[1]]
+
+    def _cumulative(self, t):
+        base, i, offset = self._locate(t)
+        within = self.cumulative[i] + (offset - self.starts[i]) * self.prices[i]
+        return base // self.period * self.period_cost + within if self.period else within
+
+    def cost(self, start, end):
+        # Coût d'exécution sur [start, end)
+        return self._cumulative(end) - self._cumulative(start)
+
+    def next_change(self, t):
+        # Premier instant > t où le prix change, INF s'il n'y en a plus
+        base, i, _ = self._locate(t)
+        if i + 1 < len(self.starts):
+            return base + self.starts[i + 1]
+        if not self.period or len(self.starts) == 1:
+            return INF
+        # Fin de période : le prix change si le premier intervalle a un autre prix
+        if self.prices[0] != self.prices[-1]:
+            return base + self.period
+        return base + self.period + self.starts[1]
+
+    def next_cheaper(self, t):
+        # Première minute > t où le prix est strictement plus bas qu'à t, INF sinon
+        base, i, _ = self._locate(t)
+        return base + self.next_lower[i]
+
+    def cheapest(self, start, end):
+        # (prix minimum, première minute où il est atteint) sur [start, end)
+        return cheapest_period(self, start, end)
+
+    def min_price(self, start, end):
+        # Prix minimum sur [start, end), INF si l'intervalle est vide
+        return self.cheapest(start, end)[0]
+
+    def __repr__(self):
+        return f"PiecewiseTariff({len(self.starts)} intervalles, période={self.period})"
+
+
+def day_intervals(tariff_model):
+    # (débuts en minutes, prix par minute) d'une journée, un intervalle par changement de prix horaire
+    price_of = tariff_model if callable(tariff_model) else (lambda hour: hourly_price(hour, tariff_model))
+    return [hour * 60 for hour in range(24)], [price_of(hour) / 60 for hour in range(24)]
+
+
+def calendar_tariff(day_models, periodic=True):
+    """
+    Tarif jour par jour : day_models[i] est le modèle du jour i (tariff_model
+    entier ou fonction heure -> prix par heure).
+    Ex : semaine [2]*5 + [1]*2 ; saisons : un modèle par jour de l'année.
+    periodic : le calendrier se répète, sinon le dernier prix reste valable ensuite.
+    """
+    starts, prices = [], []
+    for day, model in enumerate(day_models):
+        day_starts, day_prices = day_intervals(model)
+        starts += [day * DAY + s for s in day_starts]
+        prices += day_prices
+    return PiecewiseTariff(starts, prices, period=len(day_models) * DAY if periodic else None)
+
+
+def periodic_tariff(tariff_model):
+    # Même modèle tous les jours, sur un horizon illimité
+    return calendar_tariff([tariff_model])
+
+
+def weekly_tariff(weekday_model, weekend_model):
+    # Lundi-vendredi puis samedi-dimanche, répété chaque semaine (jour 0 = lundi)
+    return calendar_tariff([weekday_model] * 5 + [weekend_model] * 2)
+
+
+_tariffs = {} # Un seul précalcul par tariff_model
+
+def get_tariff(tariff_model):
+    # Un tarif déjà construit (Tariff, PiecewiseTariff) est renvoyé tel quel
+    # (entiers NumPy acceptés comme modèles, ex : case d'un tableau de modèles)
+    if not isinstance(tariff_model, numbers.Integral):
+        return tariff_model
+    tariff_model = int(tariff_model)
+    if tariff_model not in _tariffs:
+        _tariffs[tariff_model] = Tariff(tariff_model)
+    return _tariffs[tariff_model]
@@ -1,367 +1,235 @@
-import copy
-import time
+import sys
 
-from matplotlib import ticker
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+from tariff import get_tariff
+from workload import Task
+from plotting import plot_schedule
+from engine import INF, Simulation, run_policy, head_policy
+from multi import MultiSimulation, run_global, run_partitioned
 
 tariff_model = 2  # Modèle tarifaire par défaut
-
-class Task:
-    def __init__(self, name, arrival_time, execution_time, deadline):
-        self.name = name # Nom de la tâche
-        self.arrival_time = round(arrival_time * 60) # Date d'arrivée de la tâche
-        self.execution_time = round(execution_time * 60)  # Temps d'exécution total de la tâche
-        self.remaining_time = round(execution_time * 60) # Temps d'exécution restant
-        self.deadline = round(deadline * 60) # Échéance de la tâche
-
-    def get_laxity(self, current_time):
-        # Laxité = (Échéance - Temps actuel) - Temps d'exécution restant
-        # Correspond au temps disponible avant l'échéance après avoir pris en compte le temps d'exécution restant
-        return round(((self.deadline - current_time) - self.remaining_time),2)   
-    
+WINDOW = 120 # Fenêtre de prix regardée par online_windowed (minutes)
 
 def get_cost_at_hour(hour, tariff_model):
+    # Coût par minute à la minute `hour`, lu dans le tableau précalculé du modèle
+    return get_tariff(tariff_model).price_at(hour)
 
-    hour = round(hour/60, 2)  # Convertir en heures
-    price = 0
 
-    if tariff_model == 2:
-        #7h-11h & 17h-21h: Peak, autres: OffPeak
-        #hour = t % 24
-        if 7 <= hour < 11 or 17 <= hour < 21:
-            price = 3 # Peak
+def greedy_rule(cost_opt):
+    #Règle par tâche de greedy : (exécuter ?, instant jusqu'auquel la décision reste valable)
+    #Partagée par le mode multi-machines (multi.py) et le mode flux (stream.py)
 
-        else:
-            price = 1 # OffPeak
+    def rule(sim, current_task):
+        current_time = sim.current_time
+        current_price = sim.tariff.price_at(current_time)
+        laxity = current_task.get_laxity(current_time)
 
-    else:
-        # 0h-7h: OffPeak, 7h-11h: MidPeak, 11h-17h: Peak, 17h-20h: MidPeak, 20h-24h: OffPeak
-        #hour = t % 24
-        if 11 <= hour < 17: 
-            price = 3 # Peak
-        elif 7 <= hour < 11 or 17 <= hour < 20: 
-            price = 2 # MidPeak
-        else:
-            price = 1 # OffPeak
+        #Economie de coût si on peut retarder l'exécution
+        if not cost_opt or laxity == 0:
+            return True, INF
+        if current_price < 2/60:
+            return True, sim.tariff.next_change(current_time)
+        # Attente jusqu'au prochain changement de prix ou jusqu'à laxité nulle
+        return False, min(sim.tariff.next_change(current_time), current_time + laxity)
 
-    return price/60  # Convertir en coût par minute
+    return rule
 
 
-def greedy(tasks_list, strategy="EDF",tariff_model=tariff_model,cost_opt=False):
+def greedy(tasks_list, strategy="EDF",tariff_model=tariff_model,cost_opt=False, verbose=True, machines=1, dispatch="global"):
     #Algorithme d'ordonnancement glouton avec optimisation de coût optionnelle
+    #Renvoie un ScheduleResult (historique dans result.history)
+    #machines > 1 : machines identiques, dispatch "global" (une file commune) ou "partitioned" (voir multi.py)
 
-    current_time = 0 #Début de la simulation
-    completed_tasks = [] #Liste des tâches complétées
-    active_tasks = [] #Liste des tâches actives
-    failed_tasks = [] #Liste des tâches échouées
-    total_cost = 0 #Coût total de l'ordonnancement 
-    total_inital_tasks = len(tasks_list) #Nombre total de tâches initiales
-    history = [] #Historique des taches pour le diagramme de Gantt
-    start_loop_time = time.time()
-    
-    # Simulation pas à pas
-    while tasks_list or active_tasks:
-        #Ajout des tâches qui viennent d'arriver
-        new_arrivals = [t for t in tasks_list if t.arrival_time == current_time] #Tâches arrivant à l'instant t
-        active_tasks.extend(new_arrivals)
-        for t in new_arrivals: tasks_list.remove(t)
+    if machines > 1 and dispatch == "partitioned":
+        return run_partitioned(tasks_list, machines, lambda part: greedy(part, strategy, tariff_model, cost_opt, verbose=False), verbose)
 
+    rule = greedy_rule(cost_opt)
 
-        # Si (Temps actuel + Temps restant > Deadline), la tâche est condamnée et supprimée
-        missed = [t for t in active_tasks[:] if (current_time + t.remaining_time) > t.deadline]
-        for t in missed:
-            failed_tasks.append(t)
-            active_tasks.remove(t)
+    # Simulation événement par événement
+    if machines > 1:
+        sim = run_global(MultiSimulation(tasks_list, get_tariff(tariff_model), strategy, machines), rule)
+    else:
+        #Choisir la tâche selon la stratégie (tête de la file de priorité)
+        sim = run_policy(Simulation(tasks_list, get_tariff(tariff_model), strategy), head_policy(rule, strategy))
 
-        if active_tasks:
-            #Trier et choisir la tâche selon la stratégie
-            if strategy == "EDF":
-                active_tasks.sort(key=lambda x: x.deadline)
-            elif strategy == "LLF":
-                active_tasks.sort(key=lambda x: x.get_laxity(current_time))
-
-
-
-            
-                
-            current_task = active_tasks[0]
-
-            current_price = get_cost_at_hour(current_time, tariff_model)
-            laxity = current_task.get_laxity(current_time)
-
-            #Economie de coût si on peut retarder l'exécution
-            if not cost_opt or current_price < 2/60 or laxity == 0:
-                
-                history.append((current_time, current_task.name, current_price*60))
-                #Ajout du coût (par minute)
-                cost_multiplier = get_cost_at_hour(current_time, tariff_model)
-                total_cost += cost_multiplier
-                
-                #Exécution de la tâche pendant une unité de temps
-                current_task.remaining_time -= 1
-                if current_task.remaining_time == 0:
-                    active_tasks.remove(current_task)
-                    completed_tasks.append(current_task)
-                
-
-        current_time += 1
-
-    print("Simulation completed in", time.time() - start_loop_time, "seconds.")
-    print("End time:", round(current_time/60,2), "hours")
-    print("Total cost:", round (total_cost,2))
-    print("Completed tasks:" , len(completed_tasks)/total_inital_tasks * 100, "%")
-
-    return history
-    
-def rolling_horizon(tasks_list, strategy="EDF", tariff_model=tariff_model):
-    current_time = 0
-    completed_tasks = []
-    active_tasks = []
-    failed_tasks = []
-    total_cost = 0
-    total_initial = len(tasks_list)
-    history = []
-    
-    while tasks_list or active_tasks:
-        
-        #Arrivée des tâches
-        new_arrivals = [t for t in tasks_list if t.arrival_time == current_time]
-        active_tasks.extend(new_arrivals)
-        for t in new_arrivals: tasks_list.remove(t)
-
-        # Nettoyage des échecs
-        missed = [t for t in active_tasks if (current_time + t.remaining_time) > t.deadline]
-        for t in missed:
-            failed_tasks.append(t)
-            active_tasks.remove(t)
+    result = sim.result()
+    if verbose:
+        print("Simulation completed in", result.wall_time, "seconds.")
+        print("End time:", round(sim.current_time/60,2), "hours")
+        print("Total cost:", round (sim.total_cost,2))
+        print("Completed tasks:" , len(sim.completed)/sim.total_initial * 100, "%")
 
-        if active_tasks:
-            
-            # Tri selon la stratégie
-            if strategy == "EDF":
-                active_tasks.sort(key=lambda x: x.deadline)
-            elif strategy == "LLF":
-                active_tasks.sort(key=lambda x: x.get_laxity(current_time))
-
-            current_task = active_tasks[0]
-            horizon= current_task.deadline - current_time
-        
-            # On regarde le prix futur dans l'horizon choisi
-            current_price = get_cost_at_hour(current_time, tariff_model)
-            
-            # On cherche s'il y a un prix plus bas dans l'horizon
-            future_prices = [get_cost_at_hour(current_time + offset, tariff_model) 
-                             for offset in range(1, horizon + 1)]
-            min_future_price = min(future_prices)
-            
-            laxity = current_task.get_laxity(current_time)
-
-      
-            if current_price <= min_future_price or laxity == 0 or current_price <= (1/60):
-                # Exécution
-                total_cost += current_price
-                current_task.remaining_time -= 1
-                history.append((current_time, current_task.name, current_price * 60))
-                
-                if current_task.remaining_time == 0:
-                    active_tasks.remove(current_task)
-                    completed_tasks.append(current_task)
-            
-
-        current_time += 1
-        
-
-    print("End time:", round(current_time/60,2), "hours")
-    print("Total cost:", round (total_cost,2))
-    print("Completed tasks:" , len(completed_tasks)/total_initial * 100, "%")
-
-    return history
-
-def plot_gantt(history, ax=None):
+    return result
     
+class RollingPlan:
+    """
+    Règle par tâche de rolling_horizon (voir greedy_rule), avec un plan gardé
+    d'une décision à l'autre au lieu d'être recalculé à chaque événement :
+    - la période tarifaire courante (début, fin, prix, prochaine minute moins
+      chère), relue seulement quand le temps sort de la période (y compris en
+      revenant en arrière : Simulation.reset(), nouveau flux) ou quand le
+      tarif change ;
+    - pour la tâche en tête, le choix exécuter / attendre dans cette période
+      (il ne dépend que de sa deadline), refait seulement quand la tête change
+      (arrivée, fin ou échec d'une tâche) ou avec la période.
+    Une instance peut resservir pour une autre simulation.
+    """
 
-    if ax is None:
-        fig, ax = plt.subplots(figsize=(24, 6))
-        show_plot = True
+    def __init__(self):
+        self.tariff = None
+        self.period_start = INF # Période tarifaire courante [début, fin)
+        self.period_end = -1
+        self.price = None
+        self.cheaper = None
+        self.head = None # Tâche pour laquelle self.run a été calculé
+        self.run = False
+
+    def refresh(self, tariff, current_time):
+        # Nouvelle période tarifaire : prix courant et prochain prix plus bas
+        self.tariff = tariff
+        self.period_start = current_time
+        self.period_end = tariff.next_change(current_time)
+        # On regarde le prix futur dans l'horizon choisi
+        self.price = tariff.price_at(current_time)
+        # Première minute avec un prix plus bas (la même pour toute la période)
+        self.cheaper = tariff.next_cheaper(current_time)
+        self.head = None
+
+    def __call__(self, sim, current_task):
+        current_time = sim.current_time
+        if sim.tariff is not self.tariff or not self.period_start <= current_time < self.period_end:
+            self.refresh(sim.tariff, current_time)
+
+        laxity = current_task.get_laxity(current_time)
+
+        if laxity == 0:
+            return True, INF
+
+        if current_task is not self.head:
+            # On cherche s'il y a un prix plus bas dans l'horizon (jusqu'à la deadline incluse)
+            self.head = current_task
+            self.run = self.cheaper > current_task.deadline or self.price <= (1/60)
+
+        # Le prix courant et le minimum futur ne changent qu'au changement de tarif
+        if self.run:
+            # Exécution
+            return True, self.period_end
+        return False, min(self.period_end, current_time + laxity)
+
+
+def rolling_horizon(tasks_list, strategy="EDF", tariff_model=tariff_model, verbose=True, machines=1, dispatch="global"):
+    #Renvoie un ScheduleResult (historique dans result.history)
+    #machines > 1 : machines identiques, dispatch "global" ou "partitioned" (voir multi.py)
+
+    if machines > 1 and dispatch == "partitioned":
+        return run_partitioned(tasks_list, machines, lambda part: rolling_horizon(part, strategy, tariff_model, verbose=False), verbose)
+
+    if machines > 1:
+        sim = run_global(MultiSimulation(tasks_list, get_tariff(tariff_model), strategy, machines), RollingPlan())
     else:
-        show_plot = False
-
-    task_colors = {}
-    color_index = 0
-    colors = plt.get_cmap('tab20', len(set([h[1] for h in history])))
-
-    for time, task_name, price in history:
-        if task_name not in task_colors:
-            task_colors[task_name] = colors(color_index)
-            color_index += 1
-        ax.broken_barh([(time, 1)], (0, price), facecolors=task_colors[task_name])
-
-    ax.set_ylim(0, max([h[2] for h in history]) + 1)
-    ax.set_xlim(0, max([h[0] for h in history]) + 1)
-    ax.xaxis.set_major_locator(ticker.MultipleLocator(60))
-    formatter = ticker.FuncFormatter(lambda x, pos: f'{int(x/60)}')
-    ax.xaxis.set_major_formatter(formatter)
-    ax.set_xlabel('Time')
-    ax.set_yticks([])
-    
+        #Choisir la tâche selon la stratégie (tête de la file de priorité)
+        sim = run_policy(Simulation(tasks_list, get_tariff(tariff_model), strategy), head_policy(RollingPlan(), strategy))
 
-    # Create legend
-    patches = [mpatches.Patch(color=color, label=task) for task, color in task_colors.items()]
-    plt.legend(handles=patches, bbox_to_anchor=(1.05, 1), loc='upper left')
+    result = sim.result()
+    if verbose:
+        print("End time:", round(sim.current_time/60,2), "hours")
+        print("Total cost:", round (sim.total_cost,2))
+        print("Completed tasks:" , len(sim.completed)/sim.total_initial * 100, "%")
 
-    if show_plot:
-        plt.tight_layout()
-        plt.show()
-
-def plot_cost_profile(tariff_model, max_hours=24, ax=None):
-    """
-    Affiche la courbe des coûts.
-    """
-    if ax is None:
-        fig, ax = plt.subplots(figsize=(24, 4))
-        show_plot = True
-    else:
-        show_plot = False
+    return result
 
-    # Génération des données minute par minute
-    minutes = list(range(0, max_hours * 60))
-    costs = [get_cost_at_hour(m, tariff_model) * 60 for m in minutes]
-    
-    ax.plot(minutes, costs, drawstyle='steps-post', color='tab:red', linewidth=2, label=f'Tariff Model {tariff_model}')
-    
-    ax.set_ylim(0, 4)
-    ax.set_yticks([1, 2, 3])
-    ax.set_yticklabels(["Off (1)", "Mid (2)", "Peak (3)"])
-    ax.grid(True, linestyle='--', alpha=0.6)
-    ax.legend(loc='upper right') # Utiliser ax.legend
-    
+def online_windowed(tasks_list, tariff_model=tariff_model, verbose=True):
+    #Variante de online_full_tasks (Tasks.py) : la tâche en tête ne regarde les prix que sur WINDOW minutes,
+    #s'exécute dès que sa laxité vaut 1, et reste la tâche en cours pendant qu'elle attend
+    #Les arrivées sont prises après la minute exécutée
+    #Renvoie un ScheduleResult (historique dans result.history)
 
-    if show_plot:
-        # Si on affiche seul, on formate l'axe X ici
-        ax.xaxis.set_major_locator(ticker.MultipleLocator(60))
-        formatter = ticker.FuncFormatter(lambda x, pos: f'{int(x/60)}h')
-        ax.xaxis.set_major_formatter(formatter)
-        plt.show()
+    sim = Simulation(tasks_list, get_tariff(tariff_model))
+    tariff = sim.tariff
+    active_tasks = sim.active #File des tâches actives (triée par deadline)
 
+    while sim.has_pending() or active_tasks:
+        #Ajout des tâches arrivées pendant que la machine était libre
+        new_arrivals = sim.admit() if not active_tasks else []
 
-def online_full_tasks():
-    
-    current_time = 0 #Début de la simulation
-    completed_tasks = [] #Liste des tâches complétées
-    active_tasks = [] #Liste des tâches actives
-    failed_tasks = [] #Liste des tâches échouées
-    total_cost = 0 #Coût total de l'ordonnancement 
-    total_inital_tasks = len(tasks_list) #Nombre total de tâches initiales
-    history = [] #Historique des taches pour le diagramme de Gantt
-    start_loop_time = time.time()
-    new_arrivals = [t for t in tasks_list if t.arrival_time <= current_time] #Tâches arrivant à l'instant t
-
-    while tasks_list or active_tasks:
-        active_tasks.extend(new_arrivals)
-        for t in new_arrivals: tasks_list.remove(t)
-
-        missed = [t for t in active_tasks[:] if (current_time + t.remaining_time) > t.deadline]
-        for t in missed:
-            failed_tasks.append(t)
-            active_tasks.remove(t)
+        # Si (Temps actuel + Temps restant > Deadline), la tâche est condamnée et supprimée
+        sim.drop_missed(new_arrivals)
 
         if active_tasks:
-            active_tasks.sort(key=lambda x: x.deadline)
-            current_task = active_tasks[0]
+            current_task = active_tasks.first()
 
             while current_task.remaining_time > 0:
-                current_price = get_cost_at_hour(current_time, tariff_model)
+                current_time = sim.current_time
+                current_price = tariff.price_at(current_time)
                 laxity = current_task.get_laxity(current_time)
-                
-                horizon = current_task.deadline - current_time
-                if horizon > 1:
-                    future_prices = [get_cost_at_hour(current_time + offset, tariff_model) 
-                                    for offset in range(1, min(horizon + 1, 120))]
-                    min_future_price = min(future_prices) if future_prices else current_price
-                else:
-                    min_future_price = current_price
-                
-                should_execute = (current_price <= (1/60) or current_price <= min_future_price or laxity <= 1)
-                
-                if should_execute:
-                    total_cost += current_price
-                    history.append((current_time, current_task.name, current_price*60))
-                    current_task.remaining_time -= 1
+
+                # Première minute moins chère, la même jusqu'au prochain changement de tarif
+                cheaper = tariff.next_cheaper(current_time)
+                # Pas de prix plus bas dans la fenêtre de WINDOW minutes (ou jusqu'à la deadline)
+                window_end = min(current_task.deadline, current_time + WINDOW - 1)
+                forced = current_price <= (1/60) or laxity <= 1 or current_task.deadline - current_time <= 1
+
+                if forced or cheaper > window_end:
+                    # La fenêtre avance avec le temps : la minute moins chère y entre à cheaper - WINDOW + 1
+                    end = min(current_time + current_task.remaining_time, tariff.next_change(current_time))
+                    if not forced and cheaper <= current_task.deadline:
+                        end = min(end, cheaper - WINDOW + 1)
+                    new_arrivals = []
+                    if sim.next_arrival() <= current_time:
+                        #Tâches arrivant pendant cette minute : une seule minute, puis échange éventuel
+                        new_arrivals = sim.admit()
+                        end = current_time + 1
+                    else:
+                        end = min(end, sim.next_arrival())
+                    sim.execute(current_task, end)
+
+                    if len(new_arrivals) > 1:
+                        first, second = active_tasks.first_two()
+                        if first.execution_time+second.execution_time <= current_task.remaining_time:
+                            current_task.execution_time = current_task.remaining_time
+                            current_task = first
                 else:
-                    current_time += 1
-                    new_arrivals = [t for t in tasks_list if t.arrival_time <= current_time]
-                    active_tasks.extend(new_arrivals)
-                    for t in new_arrivals:
-                        tasks_list.remove(t)
-                    active_tasks.sort(key=lambda x: x.deadline)
-                    
-                    if (current_time + current_task.remaining_time) > current_task.deadline:
-                        failed_tasks.append(current_task)
+                    # Attente jusqu'à laxité 1, au changement de tarif ou à la prochaine arrivée
+                    end = min(current_time + laxity - 1, tariff.next_change(current_time))
+                    sim.skip(min(end, max(sim.next_arrival(), current_time + 1)))
+                    sim.admit()
+
+                    if current_task.get_laxity(sim.current_time) < 0:
+                        sim.failed.append(current_task)
                         active_tasks.remove(current_task)
+                        sim.latest_starts.remove(current_task)
                         break
-                    continue
-                
-                new_arrivals = [t for t in tasks_list if t.arrival_time <= current_time]
-                active_tasks.extend(new_arrivals)
-                active_tasks.sort(key=lambda x: x.deadline)
-              
-                for t in new_arrivals:
-                    tasks_list.remove(t)
-
-                if len(new_arrivals) > 1:
-                    if active_tasks[0].execution_time+active_tasks[1].execution_time <= current_task.remaining_time:
-                        current_task.execution_time = current_task.remaining_time
-                        new_arrivals.append(current_task)
-                        current_task = active_tasks[0]
-                
-                current_time += 1
-
-            if current_task.remaining_time == 0:
-                if current_task in active_tasks:
-                    active_tasks.remove(current_task)
-                completed_tasks.append(current_task)
 
         else:
-            current_time += 1 
-               
-    print("Simulation completed in", time.time() - start_loop_time, "seconds.")
-    print("End time:", round(current_time/60,2), "hours")
-    print("Total cost:", round(total_cost,2))
-    print("Completed tasks:", len(completed_tasks)/total_inital_tasks * 100, "%")
-    print("completed tasks:", [t.name for t in completed_tasks])
-    print("Failed tasks:", [t.name for t in failed_tasks])
-
-    return history
-
-
-tasks_list = [
-    Task("T1", arrival_time=0, execution_time=2.5, deadline=10),
-    Task("T10"  , arrival_time=0.5, execution_time=1, deadline=7),
-    Task("T11"  , arrival_time=0.5, execution_time=1, deadline=9),
-    Task("T7", arrival_time=3.5, execution_time=2.2, deadline=11),
-    Task("T2", arrival_time=2, execution_time=3, deadline=8),
-    Task("T9", arrival_time=7, execution_time=4.6, deadline=180),
-    Task("T4", arrival_time=6, execution_time=1, deadline=9),
-    Task("T14", arrival_time=3.5, execution_time=2.2, deadline=11),
-    Task("T3", arrival_time=4, execution_time=2, deadline=12),
-    Task("T5", arrival_time=8, execution_time=2.3, deadline=12),
-    Task("T6", arrival_time=1, execution_time=5, deadline=14),
-    Task("T8", arrival_time=5, execution_time=2, deadline=13)
-]
-
-
-l1=copy.deepcopy(tasks_list)
-l2=copy.deepcopy(tasks_list)
-
-
-
-history = online_full_tasks()
-
-
-fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(13, 8), sharex=True, gridspec_kw={'height_ratios': [1, 3]})
-plt.subplots_adjust(hspace=0.1)
-
-plot_cost_profile(tariff_model=tariff_model, max_hours=24, ax=ax1) # Dessine en haut
-plot_gantt(history, ax=ax2)
-plt.show()
\ No newline at end of file
+            sim.skip(max(sim.current_time + 1, sim.next_arrival()) if sim.has_pending() else sim.current_time + 1)
+
+    result = sim.result()
+    if verbose:
+        print("Simulation completed in", result.wall_time, "seconds.")
+        print("End time:", round(sim.current_time/60,2), "hours")
+        print("Total cost:", round(sim.total_cost,2))
+        print("Completed tasks:", len(sim.completed)/sim.total_initial * 100, "%")
+        print("completed tasks:", result.completed)
+        print("Failed tasks:", result.failed)
+
+    return result
+
+
+if __name__ == "__main__":
+    tasks_list = [
+        Task("T1", arrival_time=0, execution_time=2.5, deadline=10),
+        Task("T10"  , arrival_time=0.5, execution_time=1, deadline=7),
+        Task("T11"  , arrival_time=0.5, execution_time=1, deadline=9),
+        Task("T7", arrival_time=3.5, execution_time=2.2, deadline=11),
+        Task("T2", arrival_time=2, execution_time=3, deadline=8),
+        Task("T9", arrival_time=7, execution_time=4.6, deadline=180),
+        Task("T4", arrival_time=6, execution_time=1, deadline=9),
+        Task("T14", arrival_time=3.5, execution_time=2.2, deadline=11),
+        Task("T3", arrival_time=4, execution_time=2, deadline=12),
+        Task("T5", arrival_time=8, execution_time=2.3, deadline=12),
+        Task("T6", arrival_time=1, execution_time=5, deadline=14),
+        Task("T8", arrival_time=5, execution_time=2, deadline=13)
+    ]
+
+    history = online_windowed(tasks_list).history
+    # python task2.py planning.png : enregistre la figure sans l'afficher
+    plot_schedule(history, tariff_model, output=sys.argv[1] if len(sys.argv) > 1 else None)
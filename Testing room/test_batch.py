@@ -0,0 +1,41 @@
+"""
+Simulateur par lots (batch.py) : instance par instance, même coût et mêmes
+nombres de tâches terminées / échouées que les simulations de référence
+minute par minute (test_engine.py).
+"""
+
+import pytest
+
+from batch import simulate_batch
+from test_engine import CASES, reference
+from workload import Task
+
+
+def test_batch_zero_length_task():
+    result = simulate_batch([[Task("Z", 0, 0, 1), Task("A", 0, 1, 5)]], "EDF", 2)
+    assert result["completed"].tolist() == [2]
+    assert result["failed"].tolist() == [0]
+
+
+def test_batch_empty():
+    # Aucune instance, ou des instances sans tâche (éventuellement à côté d'une instance non vide)
+    assert all(len(values) == 0 for values in simulate_batch([]).values())
+    result = simulate_batch([[]], "EDF", 2)
+    assert result["completed"].tolist() == [0] and result["total_cost"].tolist() == [0.0]
+    result = simulate_batch([[], [Task("A", 0, 1, 5)]], "LLF", 2, rolling=True)
+    assert result["completed"].tolist() == [0, 1]
+    assert result["completion_rate"].tolist() == [0.0, 100.0]
+
+
+@pytest.mark.parametrize("strategy", ["EDF", "LLF"])
+@pytest.mark.parametrize("mode", ["greedy", "cost_opt", "rolling"])
+def test_batch_matches_reference(strategy, mode):
+    # Un tarif par instance (modèles 2 et 3 en alternance)
+    models = [2 + case % 2 for case in range(len(CASES))]
+    batch = simulate_batch(CASES, strategy, models, cost_opt=mode == "cost_opt", rolling=mode == "rolling")
+    for case, tariff_model in enumerate(models):
+        _, total_cost, completed_tasks, failed_tasks = reference(
+            case, strategy, tariff_model, mode == "cost_opt", mode == "rolling")
+        assert batch["total_cost"][case] == pytest.approx(total_cost)
+        assert batch["completed"][case] == len(completed_tasks)
+        assert batch["failed"][case] == len(failed_tasks)
@@ -0,0 +1,60 @@
+"""
+Benchmark (benchmark.py) : ratios à l'optimum hors ligne, marqués comme
+bornes quand l'optimum n'est pas exact ; exécution parallèle identique à
+l'exécution sur un seul processus.
+"""
+
+import random
+
+from benchmark import ALGORITHMS, REFERENCE, run_parallel_benchmark
+from offline import EXACT_LIMIT
+from test_engine import CASES
+from workload import Task
+
+
+def large_dataset(n):
+    # Plus de EXACT_LIMIT tâches : l'optimum hors ligne n'est qu'une borne
+    rng = random.Random(0)
+    tasks = []
+    for i in range(n):
+        arrival = rng.uniform(0, 10)
+        execution = rng.uniform(0.1, 1)
+        tasks.append(Task(f"T{i}", arrival, execution, arrival + execution + rng.uniform(0, 3)))
+    return tasks
+
+
+def test_optimum_ratios_are_marked_as_bounds():
+    datasets = {"small": large_dataset(5), "large": large_dataset(EXACT_LIMIT + 10)}
+    results = run_parallel_benchmark(datasets, ("GREEDY EDF (Sans opti coût)", "RÉSERVATION DE CRÉNEAUX", REFERENCE),
+                                     max_workers=1)
+    optima = {r["dataset"]: r for r in results if r["algorithm"] == REFERENCE}
+    assert optima["small"]["exact"] and not optima["large"]["exact"]
+    for result in results:
+        if result["algorithm"] == REFERENCE:
+            assert result["optimum_ratio"] is None and result["optimum_exact"] is None
+            continue
+        optimum = optima[result["dataset"]]
+        assert result["optimum_exact"] == optimum["exact"]
+        if len(result["completed"]) == len(optimum["completed"]):
+            assert result["optimum_ratio"] == result["cost"] / optimum["cost"]
+        else:
+            assert result["optimum_ratio"] is None # Coûts non comparables à nombre de tâches différent
+
+
+def test_no_reference_no_optimum_ratio():
+    results = run_parallel_benchmark({"small": large_dataset(5)}, ("GREEDY EDF (Sans opti coût)",), max_workers=1)
+    assert results[0]["optimum_ratio"] is None and results[0]["optimum_exact"] is None
+
+
+def without_wall_time(results):
+    return [{key: value for key, value in result.items() if key != "wall_time"} for result in results]
+
+
+def test_parallel_matches_serial():
+    # Plusieurs processus : mêmes résultats que max_workers=1, dans l'ordre de la grille
+    datasets = {f"case{i}": tasks for i, tasks in enumerate(CASES)}
+    serial = run_parallel_benchmark(datasets, tariff_models=(2, 3), max_workers=1)
+    parallel = run_parallel_benchmark(datasets, tariff_models=(2, 3), max_workers=4)
+    grid = [(name, algorithm, tariff_model) for name in datasets for algorithm in ALGORITHMS for tariff_model in (2, 3)]
+    assert [(r["dataset"], r["algorithm"], r["tariff_model"]) for r in parallel] == grid
+    assert without_wall_time(parallel) == without_wall_time(serial)
@@ -0,0 +1,64 @@
+"""
+Programmation dynamique de Wan & Qi (mv2_4.py), comparée à la version
+d'origine : une table dict fin -> (nombre, coût, planning) recopiée à chaque
+tâche. Les états sont parcourus par fin croissante et, à égalité, la fin la
+plus tôt l'emporte, comme dans la table dense.
+
+Sans élagage et avec l'élagage exact : même nombre de tâches, même coût et
+même planning.
+"""
+
+import random
+
+import pytest
+
+from mv2_4 import TariffProfile, solve_wan_qi_precision
+from workload import Task
+
+
+def reference_dp(tasks, profile):
+    dp = {0: (0, 0.0, [])}
+    for task in sorted(tasks, key=lambda t: t.d):
+        for t_prev, (count, cost, schedule) in sorted(dp.copy().items()):
+            start_time = max(t_prev, task.r)
+            end_time = start_time + task.p
+            if end_time > profile.horizon_min or end_time > task.d:
+                continue
+            new_count = count + 1
+            new_cost = cost + profile.get_cost(start_time, end_time)
+            if end_time not in dp or new_count > dp[end_time][0] or (
+                    new_count == dp[end_time][0] and new_cost < dp[end_time][1]):
+                dp[end_time] = (new_count, new_cost, schedule + [(task, start_time, end_time)])
+    # Meilleur état (nombre, puis coût), la fin la plus tôt à égalité
+    return max(sorted(dp.items()), key=lambda item: (item[1][0], -item[1][1]))[1]
+
+
+def random_instance(seed):
+    # Tarif horaire aléatoire répété chaque jour, sur un ou deux jours
+    rng = random.Random(seed)
+    profile = TariffProfile(rng.choice([1, 2]) * 1440)
+    for hour in range(24):
+        profile.add_interval(hour, hour + 1, rng.choice([1, 2, 3, 10, 30, 80]), period_hours=24)
+    tasks = []
+    for i in range(rng.randint(1, 30)):
+        arrival = rng.randrange(0, profile.horizon_min - 60, 15)
+        execution = rng.randint(1, 180)
+        tasks.append(Task.from_minutes(f"T{i}", arrival, execution, arrival + execution + rng.randint(0, 600)))
+    return tasks, profile
+
+
+INSTANCES = [random_instance(seed) for seed in range(100)]
+
+
+def schedule_names(schedule):
+    return [(task.name, start, end) for task, start, end in schedule]
+
+
+@pytest.mark.parametrize("prune", [False, True])
+def test_matches_reference(prune):
+    for tasks, profile in INSTANCES:
+        count, cost, schedule = reference_dp(tasks, profile)
+        result = solve_wan_qi_precision(tasks, profile, verbose=False, prune=prune)
+        assert len(result.completed) == count
+        assert result.cost == pytest.approx(cost)
+        assert schedule_names(result.schedule) == schedule_names(schedule)
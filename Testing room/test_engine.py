@@ -0,0 +1,325 @@
+"""
+Équivalence avec la simulation minute par minute d'origine.
+
+greedy_reference et rolling_reference reprennent greedy et rolling_horizon
+de la version initiale de task2.py (une décision par minute, tri de la liste
+des tâches actives), sans les affichages. Seule différence : une tâche de
+durée nulle est terminée dès son arrivée si sa deadline n'est pas passée
+(la version initiale la faisait passer à -1 minute restante et ne
+s'arrêtait plus).
+
+online_reference reprend online_full_tasks de la version initiale de
+Tasks.py, avec la même règle pour les tâches de durée nulle. La version
+initiale relisait en tête de boucle la liste new_arrivals de la boucle
+interne, déjà ajoutée (ce qui doublait les tâches, ou s'arrêtait sur une
+erreur) : les arrivées y sont admises seulement quand aucune tâche n'est
+active, sinon par la boucle interne à la même minute. Une tâche n'est
+terminée qu'après sa dernière minute exécutée.
+
+windowed_reference reprend de la même façon online_full_tasks de la version
+initiale de task2.py (fenêtre de 120 minutes, règle laxité <= 1), qui a
+donné task2.online_windowed.
+
+Les versions à événements (engine.py) doivent donner le même historique
+minute par minute, le même coût et les mêmes tâches terminées / échouées.
+Les autres modes se comparent aux mêmes références (test_batch.py,
+test_stream.py, test_multi.py).
+"""
+
+import random
+from functools import lru_cache
+
+import pytest
+
+from Tasks import online_full_tasks
+from task2 import get_cost_at_hour, greedy, online_windowed, rolling_horizon
+from workload import Task
+
+
+def arrive(tasks_list, active_tasks, completed_tasks, current_time):
+    # Ajout des tâches arrivées (celles de durée nulle sont terminées avant leur deadline)
+    # Renvoie les tâches ajoutées à la liste des tâches actives
+    new_arrivals = []
+    for t in [t for t in tasks_list if t.arrival_time <= current_time]:
+        tasks_list.remove(t)
+        if t.remaining_time == 0 and current_time <= t.deadline:
+            completed_tasks.append(t)
+        else:
+            active_tasks.append(t)
+            new_arrivals.append(t)
+    return new_arrivals
+
+
+def drop_missed(active_tasks, failed_tasks, current_time):
+    # Si (Temps actuel + Temps restant > Deadline), la tâche est condamnée et supprimée
+    missed = [t for t in active_tasks if (current_time + t.remaining_time) > t.deadline]
+    for t in missed:
+        failed_tasks.append(t)
+        active_tasks.remove(t)
+
+
+def sort_active(active_tasks, strategy, current_time):
+    if strategy == "EDF":
+        active_tasks.sort(key=lambda x: x.deadline)
+    elif strategy == "LLF":
+        active_tasks.sort(key=lambda x: x.get_laxity(current_time))
+
+
+def greedy_reference(tasks_list, strategy, tariff_model, cost_opt):
+    tasks_list = [t.copy() for t in tasks_list]
+    current_time = 0
+    completed_tasks, active_tasks, failed_tasks, history = [], [], [], []
+    total_cost = 0
+
+    while tasks_list or active_tasks:
+        arrive(tasks_list, active_tasks, completed_tasks, current_time)
+        drop_missed(active_tasks, failed_tasks, current_time)
+
+        if active_tasks:
+            sort_active(active_tasks, strategy, current_time)
+            current_task = active_tasks[0]
+            current_price = get_cost_at_hour(current_time, tariff_model)
+            laxity = current_task.get_laxity(current_time)
+
+            if not cost_opt or current_price < 2/60 or laxity == 0:
+                history.append((current_time, current_task.name, current_price*60))
+                total_cost += current_price
+                current_task.remaining_time -= 1
+                if current_task.remaining_time == 0:
+                    active_tasks.remove(current_task)
+                    completed_tasks.append(current_task)
+
+        current_time += 1
+
+    return history, total_cost, completed_tasks, failed_tasks
+
+
+def rolling_reference(tasks_list, strategy, tariff_model):
+    tasks_list = [t.copy() for t in tasks_list]
+    # Prix minute par minute au-delà de la dernière deadline (le min se fait sur une tranche)
+    end = max(t.deadline for t in tasks_list) + 2
+    prices = [get_cost_at_hour(m, tariff_model) for m in range(end)]
+    current_time = 0
+    completed_tasks, active_tasks, failed_tasks, history = [], [], [], []
+    total_cost = 0
+
+    while tasks_list or active_tasks:
+        arrive(tasks_list, active_tasks, completed_tasks, current_time)
+        drop_missed(active_tasks, failed_tasks, current_time)
+
+        if active_tasks:
+            sort_active(active_tasks, strategy, current_time)
+            current_task = active_tasks[0]
+            horizon = current_task.deadline - current_time
+            current_price = prices[current_time]
+            min_future_price = min(prices[current_time + 1:current_time + horizon + 1])
+            laxity = current_task.get_laxity(current_time)
+
+            if current_price <= min_future_price or laxity == 0 or current_price <= (1/60):
+                total_cost += current_price
+                current_task.remaining_time -= 1
+                history.append((current_time, current_task.name, current_price * 60))
+                if current_task.remaining_time == 0:
+                    active_tasks.remove(current_task)
+                    completed_tasks.append(current_task)
+
+        current_time += 1
+
+    return history, total_cost, completed_tasks, failed_tasks
+
+
+def online_reference(tasks_list, tariff_model):
+    tasks_list = [t.copy() for t in tasks_list]
+    # Prix minute par minute (une tâche peut finir après sa deadline : marge d'une journée)
+    end = max(t.deadline for t in tasks_list) + 24 * 60
+    prices = [get_cost_at_hour(m, tariff_model) for m in range(end)]
+    current_time = 0
+    completed_tasks, active_tasks, failed_tasks, history = [], [], [], []
+    total_cost = 0
+
+    while tasks_list or active_tasks:
+        if not active_tasks:
+            arrive(tasks_list, active_tasks, completed_tasks, current_time)
+        drop_missed(active_tasks, failed_tasks, current_time)
+
+        if active_tasks:
+            active_tasks.sort(key=lambda x: x.deadline)
+            current_task = active_tasks[0]
+
+            while current_task.remaining_time > 0:
+                new_arrivals = arrive(tasks_list, active_tasks, completed_tasks, current_time)
+                active_tasks.sort(key=lambda x: x.deadline)
+
+                if len(new_arrivals) > 1:
+                    if active_tasks[0].execution_time + active_tasks[1].execution_time <= current_task.remaining_time:
+                        current_task.execution_time = current_task.remaining_time
+                        current_task = active_tasks[0]
+
+                current_price = prices[current_time]
+                window = prices[current_time:current_task.deadline]
+                if window and current_price > min(window) and current_task.get_laxity(current_time) > 0:
+                    # Retard de la tâche actuelle pour une période moins chère
+                    current_task = active_tasks[0]
+                else:
+                    total_cost += current_price
+                    history.append((current_time, current_task.name, current_price * 60))
+                    current_task.remaining_time -= 1
+                    if current_task.remaining_time == 0:
+                        active_tasks.remove(current_task)
+                        completed_tasks.append(current_task)
+                current_time += 1
+        else:
+            current_time += 1
+
+    return history, total_cost, completed_tasks, failed_tasks
+
+
+def windowed_reference(tasks_list, tariff_model):
+    tasks_list = [t.copy() for t in tasks_list]
+    end = max(t.deadline for t in tasks_list) + 24 * 60
+    prices = [get_cost_at_hour(m, tariff_model) for m in range(end)]
+    current_time = 0
+    completed_tasks, active_tasks, failed_tasks, history = [], [], [], []
+    total_cost = 0
+
+    while tasks_list or active_tasks:
+        if not active_tasks:
+            arrive(tasks_list, active_tasks, completed_tasks, current_time)
+        drop_missed(active_tasks, failed_tasks, current_time)
+
+        if active_tasks:
+            active_tasks.sort(key=lambda x: x.deadline)
+            current_task = active_tasks[0]
+
+            while current_task.remaining_time > 0:
+                current_price = prices[current_time]
+                laxity = current_task.get_laxity(current_time)
+
+                horizon = current_task.deadline - current_time
+                if horizon > 1:
+                    future_prices = prices[current_time + 1:current_time + min(horizon + 1, 120)]
+                    min_future_price = min(future_prices) if future_prices else current_price
+                else:
+                    min_future_price = current_price
+
+                if current_price <= (1/60) or current_price <= min_future_price or laxity <= 1:
+                    total_cost += current_price
+                    history.append((current_time, current_task.name, current_price * 60))
+                    current_task.remaining_time -= 1
+                    if current_task.remaining_time == 0:
+                        active_tasks.remove(current_task)
+                        completed_tasks.append(current_task)
+                else:
+                    current_time += 1
+                    arrive(tasks_list, active_tasks, completed_tasks, current_time)
+                    active_tasks.sort(key=lambda x: x.deadline)
+                    if (current_time + current_task.remaining_time) > current_task.deadline:
+                        failed_tasks.append(current_task)
+                        active_tasks.remove(current_task)
+                        break
+                    continue
+
+                new_arrivals = arrive(tasks_list, active_tasks, completed_tasks, current_time)
+                active_tasks.sort(key=lambda x: x.deadline)
+                if len(new_arrivals) > 1:
+                    if active_tasks[0].execution_time + active_tasks[1].execution_time <= current_task.remaining_time:
+                        current_task.execution_time = current_task.remaining_time
+                        current_task = active_tasks[0]
+                current_time += 1
+        else:
+            current_time += 1
+
+    return history, total_cost, completed_tasks, failed_tasks
+
+
+def random_tasks(rng, n=None):
+    """
+    Instance aléatoire en minutes sur deux jours, avec des arrivées à la même
+    minute et quelques tâches de durée nulle.
+    """
+    n = n if n is not None else rng.randint(1, 12)
+    arrivals = [rng.randrange(0, 36 * 60, 30) for _ in range(rng.randint(1, n))]
+    tasks = []
+    for i in range(n):
+        arrival = rng.choice(arrivals)
+        execution = 0 if rng.random() < 0.1 else rng.randint(1, 240)
+        deadline = arrival + execution + rng.randint(0, 600)
+        tasks.append(Task.from_minutes(f"T{i}", arrival, execution, deadline))
+    return tasks
+
+
+INSTANCES = [random_tasks(random.Random(seed)) for seed in range(100)]
+
+FIXED = [
+    # Tâche de durée nulle devant une autre tâche arrivée à la même minute
+    [Task("Z", 0, 0, 1), Task("A", 0, 1, 5)],
+    # Tâche de durée nulle de deadline plus lointaine, en heure pleine, et une autre arrivée après sa deadline
+    [Task("A", 8, 1, 12), Task("Z", 8, 0, 9), Task("B", 8, 0.5, 10), Task("Y", 9, 0, 8)],
+    # Arrivées simultanées de même deadline (ordre de la liste conservé)
+    [Task("A", 1, 1, 4), Task("B", 1, 1, 4), Task("C", 1, 0.5, 4), Task("D", 2, 1, 3)],
+]
+
+CASES = FIXED + INSTANCES
+
+
+@lru_cache(maxsize=None)
+def reference(case, strategy, tariff_model, cost_opt=False, rolling=False, online=False, windowed=False):
+    # Simulation de référence de CASES[case], calculée une fois pour tous les tests
+    # (online : online_full_tasks, windowed : online_windowed, toujours EDF)
+    if windowed:
+        return windowed_reference(CASES[case], tariff_model)
+    if online:
+        return online_reference(CASES[case], tariff_model)
+    if rolling:
+        return rolling_reference(CASES[case], strategy, tariff_model)
+    return greedy_reference(CASES[case], strategy, tariff_model, cost_opt)
+
+
+def names(tasks):
+    return [t.name for t in tasks]
+
+
+def assert_same(result, reference):
+    history, total_cost, completed_tasks, failed_tasks = reference
+    assert list(result.history) == history
+    assert result.cost == pytest.approx(total_cost)
+    assert sorted(result.completed) == sorted(names(completed_tasks))
+    assert sorted(result.failed) == sorted(names(failed_tasks))
+
+
+@pytest.mark.parametrize("strategy", ["EDF", "LLF"])
+@pytest.mark.parametrize("cost_opt", [False, True])
+@pytest.mark.parametrize("tariff_model", [2, 3])
+def test_greedy_matches_reference(strategy, cost_opt, tariff_model):
+    for case, tasks in enumerate(CASES):
+        result = greedy(tasks, strategy, tariff_model, cost_opt, verbose=False)
+        assert_same(result, reference(case, strategy, tariff_model, cost_opt))
+
+
+@pytest.mark.parametrize("strategy", ["EDF", "LLF"])
+@pytest.mark.parametrize("tariff_model", [2, 3])
+def test_rolling_horizon_matches_reference(strategy, tariff_model):
+    for case, tasks in enumerate(CASES):
+        result = rolling_horizon(tasks, strategy, tariff_model, verbose=False)
+        assert_same(result, reference(case, strategy, tariff_model, rolling=True))
+
+
+def test_input_tasks_unchanged():
+    tasks = [Task("A", 0, 1, 2), Task("B", 0, 0.5, 3)]
+    greedy(tasks, verbose=False)
+    online_full_tasks(tasks, verbose=False)
+    assert [t.remaining_time for t in tasks] == [60, 30]
+
+
+@pytest.mark.parametrize("tariff_model", [2, 3])
+def test_online_full_tasks_matches_reference(tariff_model):
+    for case, tasks in enumerate(CASES):
+        result = online_full_tasks(tasks, tariff_model=tariff_model, verbose=False)
+        assert_same(result, reference(case, "EDF", tariff_model, online=True))
+
+
+@pytest.mark.parametrize("tariff_model", [2, 3])
+def test_online_windowed_matches_reference(tariff_model):
+    for case, tasks in enumerate(CASES):
+        result = online_windowed(tasks, tariff_model=tariff_model, verbose=False)
+        assert_same(result, reference(case, "EDF", tariff_model, windowed=True))
@@ -0,0 +1,37 @@
+"""
+Mode multi-machines (multi.py) : avec une seule machine, le mode global doit
+donner le même historique minute par minute, le même coût et les mêmes tâches
+terminées / échouées que les simulations de référence (test_engine.py).
+"""
+
+import pytest
+
+from multi import MultiSimulation, run_global
+from Tasks import online_full_tasks, online_global
+from task2 import RollingPlan, greedy_rule
+from tariff import get_tariff
+from test_engine import CASES, assert_same, reference
+
+
+@pytest.mark.parametrize("strategy", ["EDF", "LLF"])
+@pytest.mark.parametrize("cost_opt", [False, True])
+def test_single_machine_global_matches_greedy(strategy, cost_opt):
+    for case, tasks in enumerate(CASES):
+        sim = run_global(MultiSimulation(tasks, get_tariff(2), strategy, machines=1), greedy_rule(cost_opt))
+        result = sim.result()
+        assert_same(result, reference(case, strategy, 2, cost_opt))
+        assert result.histories[0].segments == result.history.segments
+
+
+@pytest.mark.parametrize("strategy", ["EDF", "LLF"])
+def test_single_machine_global_matches_rolling_horizon(strategy):
+    for case, tasks in enumerate(CASES):
+        sim = run_global(MultiSimulation(tasks, get_tariff(3), strategy, machines=1), RollingPlan())
+        assert_same(sim.result(), reference(case, strategy, 3, rolling=True))
+
+
+def test_single_machine_global_matches_online_full_tasks():
+    for case, tasks in enumerate(CASES):
+        expected = reference(case, "EDF", 3, online=True)
+        assert_same(online_full_tasks(tasks, 3, verbose=False, machines=1, dispatch="global"), expected)
+        assert_same(online_global(tasks, 3, machines=1, verbose=False), expected)
@@ -0,0 +1,155 @@
+"""
+Optimum hors ligne (offline.py) : dans le budget de recherche, le nombre de
+tâches terminées est maximal quelle que soit la taille de l'instance, et
+jamais inférieur à celui d'une politique en ligne, et le coût est le minimum
+trouvé par exploration exhaustive sur de petites instances. Au-delà, le
+résultat est marqué comme une borne.
+"""
+
+import random
+from functools import lru_cache
+from itertools import combinations
+
+import pytest
+
+from offline import EXACT_LIMIT, INF, edf_feasible, greedy_feasible_set, max_feasible_set, solve_preemptive_optimum
+from reservation import slot_reservation
+from tariff import PiecewiseTariff
+from task2 import greedy
+from workload import Task
+
+
+def brute_force(jobs):
+    # Taille du plus grand sous-ensemble terminable, par énumération
+    for size in range(len(jobs), 0, -1):
+        if any(edf_feasible([jobs[j] for j in subset]) for subset in combinations(range(len(jobs)), size)):
+            return size
+    return 0
+
+
+def random_tasks(rng, n):
+    tasks = []
+    for i in range(n):
+        arrival = rng.randrange(0, 1200)
+        execution = rng.randint(1, 180)
+        tasks.append(Task.from_minutes(f"T{i}", arrival, execution, arrival + execution + rng.randint(0, 300)))
+    return tasks
+
+
+# Plus petite instance où l'ancienne heuristique (au-delà de EXACT_LIMIT) terminait moins de tâches que greedy
+REGRESSION = [
+    (530, 166, 756), (16, 33, 202), (289, 137, 598), (303, 136, 452), (475, 90, 749), (135, 10, 146),
+    (258, 142, 633), (110, 176, 565), (195, 4, 418), (437, 153, 884), (493, 99, 835), (401, 175, 676),
+    (303, 120, 456), (310, 1, 532), (596, 74, 911), (318, 37, 439), (489, 178, 948),
+]
+
+
+def test_max_feasible_set_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(300):
+        jobs = []
+        for _ in range(rng.randint(1, 9)):
+            arrival, execution = rng.randrange(0, 50, 5), rng.randint(1, 20)
+            jobs.append((arrival, execution, arrival + execution + rng.randint(0, 20)))
+        chosen = max_feasible_set(jobs)
+        assert edf_feasible([jobs[j] for j in chosen])
+        assert len(chosen) == brute_force(jobs)
+
+
+def online_results(tasks):
+    yield greedy(tasks, "EDF", 2, verbose=False)
+    yield greedy(tasks, "LLF", 2, verbose=False)
+    yield slot_reservation(tasks, 2, verbose=False)
+
+
+def test_regression_beyond_exact_limit():
+    tasks = [Task.from_minutes(f"T{i}", *job) for i, job in enumerate(REGRESSION)]
+    assert len(tasks) > EXACT_LIMIT
+    optimum = solve_preemptive_optimum(tasks, 2, verbose=False)
+    assert len(optimum.completed) == 11
+    assert not optimum.exact # Un seul ensemble de taille maximale est costé
+    for result in online_results(tasks):
+        assert len(optimum.completed) >= len(result.completed)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_optimum_completes_at_least_online(seed):
+    rng = random.Random(seed)
+    tasks = random_tasks(rng, rng.randint(EXACT_LIMIT + 1, 60))
+    optimum = solve_preemptive_optimum(tasks, 2, verbose=False)
+    for result in online_results(tasks):
+        assert len(optimum.completed) >= len(result.completed)
+
+
+def test_exact_below_limit():
+    tasks = random_tasks(random.Random(0), EXACT_LIMIT)
+    assert solve_preemptive_optimum(tasks, 2, verbose=False).exact
+
+
+def test_state_budget_gives_a_bound():
+    tasks = random_tasks(random.Random(1), 200)
+    jobs = [(t.arrival_time, t.execution_time, t.deadline) for t in tasks]
+    assert max_feasible_set(jobs, budget=1000) is None
+    result = solve_preemptive_optimum(tasks, 2, budget=1000, verbose=False)
+    assert not result.exact
+    assert len(result.completed) == len(greedy_feasible_set(jobs))
+    names = set(result.completed)
+    assert edf_feasible([job for job, t in zip(jobs, tasks) if t.name in names])
+
+
+def brute_force_optimum(jobs, tariff):
+    # (nombre de tâches, coût) optimal par exploration minute par minute de chaque sous-ensemble
+    best = (0, 0.0)
+    for size in range(1, len(jobs) + 1):
+        for subset in combinations(range(len(jobs)), size):
+            chosen = [jobs[j] for j in subset]
+
+            @lru_cache(maxsize=None)
+            def cost(minute, remaining):
+                # Coût minimum pour finir les temps restants à partir de minute
+                if not any(remaining):
+                    return 0.0
+                if any(p > max(d - minute, 0) for (_, _, d), p in zip(chosen, remaining)):
+                    return INF
+                options = [cost(minute + 1, remaining)] # Machine inactive
+                for j, ((r, _, d), p) in enumerate(zip(chosen, remaining)):
+                    if p and r <= minute < d:
+                        left = remaining[:j] + (p - 1,) + remaining[j + 1:]
+                        options.append(tariff.price_at(minute) + cost(minute + 1, left))
+                return min(options)
+
+            total = cost(0, tuple(p for _, p, _ in chosen))
+            if total < INF and (size, -total) > (best[0], -best[1]):
+                best = (size, total)
+    return best
+
+
+def test_cost_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(150):
+        # Tarif à quelques paliers sur un horizon court, tâches de durée nulle comprises
+        starts = [0] + sorted(rng.sample(range(1, 12), 3))
+        tariff = PiecewiseTariff(starts, [rng.choice([1, 2, 3, 5]) for _ in starts])
+        tasks = []
+        for i in range(rng.randint(1, 5)):
+            arrival, execution = rng.randrange(0, 10), rng.randint(0, 3)
+            tasks.append(Task.from_minutes(f"T{i}", arrival, execution, min(arrival + execution + rng.randint(0, 4), 12)))
+        jobs = [(t.arrival_time, t.execution_time, t.deadline) for t in tasks]
+        count, cost = brute_force_optimum(jobs, tariff)
+        result = solve_preemptive_optimum(tasks, tariff, verbose=False)
+        assert result.exact
+        assert len(result.completed) == count
+        assert result.cost == pytest.approx(cost)
+
+
+def test_zero_length_task_keeps_cost_floor(monkeypatch):
+    # Deux ensembles de taille maximale ({X, Z} et {Y, Z}) : la borne du second atteint le coût
+    # du premier, il n'est pas costé. Z, de durée nulle et de fenêtre vide, ne rend pas la borne NaN.
+    import offline
+    calls = []
+    allocate = offline.min_cost_allocation
+    monkeypatch.setattr(offline, "min_cost_allocation", lambda jobs, tariff: calls.append(jobs) or allocate(jobs, tariff))
+    tasks = [Task.from_minutes("X", 0, 2, 2), Task.from_minutes("Y", 0, 2, 3), Task.from_minutes("Z", 5, 0, 5)]
+    result = solve_preemptive_optimum(tasks, PiecewiseTariff([0, 2], [1, 5]), verbose=False)
+    assert result.cost == 2 and len(result.completed) == 2
+    assert len(calls) == 1
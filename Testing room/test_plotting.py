@@ -0,0 +1,67 @@
+"""
+Décimation du diagramme de Gantt (plotting.py) : les barres d'une même tâche
+ne sont fusionnées que si aucune autre tâche ne s'est exécutée entre elles.
+matplotlib n'est nécessaire que pour les tracés (importé seulement au premier
+tracé), y compris les démos de Tasks.py et task2.py lancées comme scripts.
+"""
+
+import random
+import runpy
+import sys
+
+import pytest
+
+from history import as_segments
+from plotting import decimate, plot_schedule
+
+
+def test_merges_close_bars_of_one_task():
+    segments = [(0, 10, "A", 1), (12, 20, "A", 2), (40, 50, "A", 1)]
+    assert decimate(segments, 5) == [(0, 20, "A", 2), (40, 50, "A", 1)]
+    assert decimate(segments, 1) == segments
+
+
+def test_keeps_bars_apart_when_another_task_ran_between():
+    # B s'exécute dans le trou entre les deux barres de A : la fusion de A le recouvrirait
+    segments = [(0, 10, "A", 1), (10, 11, "B", 1), (12, 20, "A", 1)]
+    assert decimate(segments, 100) == segments
+
+
+def test_decimated_bars_never_cover_another_task():
+    rng = random.Random(0)
+    history, minute = [], 0
+    for _ in range(500):
+        minute += rng.choice([0, 0, 1, 5]) # Minutes d'inactivité
+        name = rng.choice("ABC")
+        for _ in range(rng.randint(1, 4)):
+            history.append((minute, name, rng.choice([1, 2, 3])))
+            minute += 1
+    runs = {m: name for m, name, _ in history}
+    segments = as_segments(history)
+    for resolution in (2, 10, 100):
+        bars = decimate(segments, resolution)
+        assert len(bars) <= len(segments)
+        # Chaque minute exécutée reste sous une barre de sa tâche, et aucune barre ne couvre une autre tâche
+        covered = {m: name for start, end, name, _ in bars for m in range(start, end)}
+        assert all(covered[m] == name for m, name in runs.items())
+        assert all(runs.get(m, name) == name for m, name in covered.items())
+
+
+def test_saving_does_not_touch_pyplot(tmp_path):
+    # Enregistrement sans fenêtre : Figure hors de pyplot, le backend reste au choix de l'appelant
+    pytest.importorskip("matplotlib")
+    imported = "matplotlib.pyplot" in sys.modules
+    history = [(minute, "A" if minute < 30 else "B", 1) for minute in range(60)]
+    plot_schedule(history, 2, output=tmp_path / "schedule.png")
+    assert (tmp_path / "schedule.png").stat().st_size > 0
+    assert ("matplotlib.pyplot" in sys.modules) == imported
+
+
+@pytest.mark.parametrize("script", ["Tasks.py", "task2.py"])
+def test_demo_runs_as_script(script, tmp_path, monkeypatch):
+    # La démo sous __main__ ne doit dépendre que de ses propres variables (pas de NameError)
+    pytest.importorskip("matplotlib")
+    output = tmp_path / "planning.png"
+    monkeypatch.setattr(sys, "argv", [script, str(output)])
+    runpy.run_path(script, run_name="__main__")
+    assert output.stat().st_size > 0
@@ -0,0 +1,158 @@
+"""
+Planification par réservation (reservation.py) : structures FreeSlots,
+Bookings (et son MaxTree) et DeadlineTree, puis validité des ordonnancements
+produits (aucune minute exécutée deux fois, chaque tâche terminée dans sa
+fenêtre).
+"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from engine import INF
+from reservation import Bookings, DeadlineTree, FreeSlots, slot_reservation
+from tariff import get_tariff
+from test_engine import CASES
+from workload import Task
+
+
+def free_minutes(free, end):
+    return [m for a, b in free.window(0, end) for m in range(a, b)]
+
+
+def test_free_slots_split_and_merge():
+    free = FreeSlots()
+    free.take(10, 20)
+    free.take(30, 40)
+    assert list(free.window(0, 50)) == [(0, 10), (20, 30), (40, 50)]
+    assert list(free.window(5, 25)) == [(5, 10), (20, 25)]
+    free.take(0, 10) # Début d'intervalle : pas de morceau vide
+    assert (free.starts, free.ends) == ([20, 40], [30, INF])
+    free.give(30, 40) # Touche ses deux voisins : un seul intervalle
+    assert (free.starts, free.ends) == ([20], [INF])
+    free.give(5, 10)
+    assert list(free.window(0, 30)) == [(5, 10), (20, 30)]
+    free.forget(15)
+    assert list(free.window(0, 30)) == [(20, 30)]
+
+
+def test_free_slots_random_against_minutes():
+    rng = random.Random(0)
+    free, taken = FreeSlots(), set()
+    for _ in range(2000):
+        a = rng.randrange(100)
+        b = a + rng.randint(1, 5)
+        if not taken & set(range(a, b)):
+            free.take(a, b)
+            taken.update(range(a, b))
+        elif set(range(a, b)) <= taken:
+            free.give(a, b)
+            taken.difference_update(range(a, b))
+        assert free_minutes(free, 120) == [m for m in range(120) if m not in taken]
+        # Intervalles disjoints, jamais contigus (fusionnés)
+        assert all(e < s for e, s in zip(free.ends, free.starts[1:]))
+
+
+def test_bookings_add_remove_cut():
+    a, b, c = (Task.from_minutes(name, 0, 10, deadline) for name, deadline in (("A", 50), ("B", 20), ("C", 90)))
+    bookings = Bookings()
+    bookings.add(10, 20, a)
+    bookings.add(0, 5, b)
+    bookings.add(30, 40, c)
+    assert bookings.at(3) == (b, 5)
+    assert bookings.at(5) == (None, 10)
+    assert bookings.at(10) == (a, 20)
+    assert bookings.at(45) == (None, INF)
+    assert list(bookings.window(4, 32)) == [(4, 5, b), (10, 20, a), (30, 32, c)]
+    # Réservations de deadline > 20 seulement, la première coupée au début de la fenêtre
+    assert list(bookings.later(4, 32, 20)) == [(10, 20, a), (30, 32, c)]
+    assert list(bookings.later(12, 35, 50)) == [(30, 35, c)]
+    # Le milieu de A coupé : il reste deux morceaux
+    assert bookings.cut(12, 15) == (10, 20, a)
+    assert bookings.entries == [(0, 5, b), (10, 12, a), (15, 20, a), (30, 40, c)]
+    assert bookings.at(13) == (None, 15)
+    assert list(bookings.later(11, 40, 20)) == [(11, 12, a), (15, 20, a), (30, 40, c)]
+    bookings.remove(10)
+    bookings.cut(30, 40) # Réservation entière : rien ne reste
+    assert bookings.entries == [(0, 5, b), (15, 20, a)]
+    bookings.forget(16) # Réservation en cours conservée
+    assert bookings.entries == [(15, 20, a)]
+    assert list(bookings.later(0, 100, 0)) == [(15, 20, a)]
+
+
+def test_bookings_later_matches_window():
+    rng = random.Random(3)
+    bookings, t = Bookings(), 0
+    for i in range(300):
+        t += rng.randint(0, 3)
+        length = rng.randint(1, 5)
+        bookings.add(t, t + length, Task.from_minutes(f"T{i}", 0, length, rng.randrange(1000)))
+        t += length
+        if rng.random() < 0.2:
+            bookings.remove(bookings.starts[rng.randrange(len(bookings.starts))])
+        if rng.random() < 0.05:
+            bookings.forget(rng.randrange(t))
+        start = rng.randrange(t + 1)
+        end, deadline = start + rng.randint(1, 200), rng.randrange(1000)
+        assert list(bookings.later(start, end, deadline)) == [
+            booking for booking in bookings.window(start, end) if booking[2].deadline > deadline]
+
+
+def test_deadline_tree_matches_scan():
+    rng = random.Random(1)
+    tree, active = DeadlineTree(), {}
+    tasks = [Task.from_minutes(f"T{i}", 0, rng.randint(0, 50), rng.randrange(5000)) for i in range(300)]
+    for order, task in enumerate(tasks):
+        for _ in range(3):
+            if active and rng.random() < 0.3:
+                other = rng.choice(list(active))
+                if rng.random() < 0.5:
+                    tree.remove(other)
+                    del active[other]
+                else:
+                    other.remaining_time = max(other.remaining_time - rng.randint(0, 10), 0)
+                    active[other] = (active[other][0], rng.randint(0, other.remaining_time))
+                    tree.set(other, active[other][1])
+        active[task] = (order, rng.randint(0, task.remaining_time))
+        tree.set(task, active[task][1], order)
+        for deadline in (task.deadline, rng.randrange(6000), 10 ** 6):
+            listed = [t for t in active if t.deadline <= deadline]
+            # max() : la première dans l'ordre (deadline, arrivée) à temps restant égal
+            listed.sort(key=lambda t: (t.deadline, active[t][0]))
+            longest = max(listed, key=lambda t: t.remaining_time) if listed else None
+            assert tree.prefix(deadline) == (len(listed), sum(active[t][1] for t in listed), longest)
+        assert len(tree) == len(active)
+
+
+def check_schedule(tasks, result, tariff_model):
+    # Aucune minute exécutée deux fois ; les tâches terminées l'ont été dans leur fenêtre
+    minutes = [minute for minute, _, _ in result.history]
+    assert len(minutes) == len(set(minutes))
+    tariff = get_tariff(tariff_model)
+    assert all(price == pytest.approx(tariff.price_at(minute) * 60) for minute, _, price in result.history) # Prix horaire
+    ran = Counter(name for _, name, _ in result.history)
+    by_name = {task.name: task for task in tasks}
+    assert sorted(result.completed + result.failed) == sorted(by_name)
+    for name in result.completed:
+        task = by_name[name]
+        assert ran[name] == task.execution_time
+        assert all(task.arrival_time <= minute < task.deadline for minute, other, _ in result.history if other == name)
+
+
+@pytest.mark.parametrize("tariff_model", [2, 3])
+def test_schedules_are_valid(tariff_model):
+    for tasks in CASES:
+        check_schedule(tasks, slot_reservation([t.copy() for t in tasks], tariff_model, verbose=False), tariff_model)
+
+
+def test_congested_schedule_is_valid():
+    # Beaucoup plus de travail que de minutes : rejets et déplacements en cascade
+    rng = random.Random(2)
+    tasks = []
+    for i in range(400):
+        arrival, execution = rng.randrange(0, 300), rng.randint(1, 60)
+        tasks.append(Task.from_minutes(f"T{i}", arrival, execution, arrival + execution + rng.randint(0, 200)))
+    result = slot_reservation([t.copy() for t in tasks], 2, verbose=False)
+    check_schedule(tasks, result, 2)
+    assert result.failed
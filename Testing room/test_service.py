@@ -0,0 +1,120 @@
+"""
+Service asyncio (service.py) sur une horloge virtuelle : les tâches soumises
+à leur date d'arrivée depuis la même boucle donnent les mêmes événements que
+stream() ; run() se termine après close(), y compris quand les dernières
+tâches sont de durée nulle ou déjà condamnées.
+"""
+
+import asyncio
+import selectors
+
+import pytest
+
+from service import SchedulerService
+from stream import stream
+from task2 import RollingPlan, greedy_rule
+from test_engine import CASES
+from workload import Task
+
+SPEED = 1 # Une minute simulée par seconde (virtuelle) : instants entiers exacts
+
+
+class VirtualSelector:
+    # Sélecteur qui avance l'horloge de la boucle au lieu d'attendre
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.selector = selectors.DefaultSelector()
+
+    def select(self, timeout=None):
+        if timeout is None:
+            raise RuntimeError("La boucle attendrait indéfiniment") # run() bloqué
+        self.loop.clock += timeout
+        return self.selector.select(0)
+
+    def __getattr__(self, name):
+        return getattr(self.selector, name)
+
+
+class VirtualLoop(asyncio.SelectorEventLoop):
+    def __init__(self):
+        self.clock = 0.0
+        super().__init__(VirtualSelector(self))
+
+    def time(self):
+        return self.clock
+
+
+def run_virtual(coroutine):
+    loop = VirtualLoop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def serve(tasks, rule, strategy="EDF"):
+    # Soumet chaque tâche à sa date d'arrivée, ferme, renvoie (résultat, événements)
+    service = SchedulerService(rule, 2, strategy, speed=SPEED)
+    runner = asyncio.ensure_future(service.run())
+    for task in sorted(tasks, key=lambda t: t.arrival_time):
+        await asyncio.sleep(max(0, task.arrival_time - service.now()) / SPEED)
+        service.submit(task)
+    service.close()
+    result = await runner
+    events = []
+    while not service.events.empty():
+        events.append(service.events.get_nowait())
+    return result, events
+
+
+def outcomes(events):
+    # Runs dans l'ordre, tâches terminées / échouées sans tenir compte de l'ordre des émissions
+    runs = [e for e in events if e[0] == "run"]
+    return runs, sorted(e[2] for e in events if e[0] == "completed"), sorted(e[2] for e in events if e[0] == "failed")
+
+
+@pytest.mark.parametrize("strategy", ["EDF", "LLF"])
+@pytest.mark.parametrize("rolling", [False, True])
+def test_service_matches_stream(strategy, rolling):
+    for tasks in CASES:
+        make = RollingPlan if rolling else lambda: greedy_rule(True)
+        result, events = run_virtual(serve(tasks, make(), strategy))
+        expected = list(stream(sorted(tasks, key=lambda t: t.arrival_time), make(), 2, strategy))
+        assert outcomes(events) == outcomes(expected)
+        assert result.cost == pytest.approx(sum(e[4] / 60 * (e[2] - e[1]) for e in expected if e[0] == "run"))
+        # Chaque run est précédé du dispatch de sa tâche
+        running = None
+        for event in events:
+            if event[0] == "dispatch":
+                running = event[2]
+            elif event[0] == "run":
+                assert event[3] == running
+
+
+@pytest.mark.parametrize("last", [
+    Task("Z", 2, 0, 3), # Durée nulle, terminée à l'arrivée
+    Task("Z", 2, 1, 2.5), # Déjà condamnée à l'arrivée
+])
+def test_close_after_zero_length_or_infeasible_task(last):
+    result, events = run_virtual(serve([Task("A", 0, 1, 5), last], greedy_rule(True)))
+    kind = "completed" if last.execution_time == 0 else "failed"
+    assert (kind, 120, "Z") in events
+    assert ("completed", 60, "A") in events
+    assert len(result.completed) + len(result.failed) == 2
+
+
+def test_close_with_nothing_submitted():
+    result, events = run_virtual(serve([], greedy_rule(True)))
+    assert events == [] and result.cost == 0
+
+
+def test_submit_after_close_is_refused():
+    async def scenario():
+        service = SchedulerService(greedy_rule(True), speed=SPEED)
+        runner = asyncio.ensure_future(service.run())
+        service.close()
+        await runner
+        with pytest.raises(RuntimeError):
+            service.submit(Task("A", 0, 1, 5))
+    run_virtual(scenario())
@@ -0,0 +1,37 @@
+"""
+Mode flux (stream.py) : pour un flux trié par arrivée, mêmes exécutions et
+mêmes tâches terminées / échouées que les simulations de référence minute
+par minute (test_engine.py).
+"""
+
+import pytest
+
+from stream import stream
+from task2 import RollingPlan, greedy_rule
+from test_engine import CASES, names, reference
+
+
+def replay(events):
+    # (historique minute par minute, terminées, échouées) à partir des événements du flux
+    history, completed, failed = [], [], []
+    for event in events:
+        if event[0] == "run":
+            _, start, end, name, price = event
+            history += [(minute, name, price) for minute in range(start, end)]
+        else:
+            (completed if event[0] == "completed" else failed).append(event[2])
+    return sorted(history), completed, failed
+
+
+@pytest.mark.parametrize("strategy", ["EDF", "LLF"])
+@pytest.mark.parametrize("rolling", [False, True])
+def test_stream_matches_reference(strategy, rolling):
+    for case, tasks in enumerate(CASES):
+        # Le flux est trié par arrivée (tri stable) : même ordre d'entrée que la liste
+        source = sorted(tasks, key=lambda t: t.arrival_time)
+        rule = RollingPlan() if rolling else greedy_rule(True)
+        history, completed, failed = replay(stream(source, rule, 2, strategy))
+        expected, _, completed_tasks, failed_tasks = reference(case, strategy, 2, True, rolling)
+        assert history == expected
+        assert sorted(completed) == sorted(names(completed_tasks))
+        assert sorted(failed) == sorted(names(failed_tasks))
@@ -0,0 +1,123 @@
+"""
+Tarifs précalculés (tariff.py), comparés au prix minute par minute : Tariff
+sur une journée, PiecewiseTariff et les tarifs calendaires sur plusieurs
+périodes, y compris aux instants de changement de prix.
+"""
+
+import random
+
+import pytest
+
+from batch import simulate_batch
+from tariff import (DAY, INF, PiecewiseTariff, calendar_tariff, get_tariff, periodic_tariff,
+                    weekly_tariff)
+from workload import Task
+
+
+def expand(tariff, end):
+    # Prix minute par minute sur [0, end)
+    return [tariff.price_at(m) for m in range(end)]
+
+
+@pytest.mark.parametrize("tariff_model", [2, 3])
+def test_cheapest_matches_min_of_prices(tariff_model):
+    tariff = get_tariff(tariff_model)
+    prices = expand(tariff, 2 * DAY)
+    rng = random.Random(tariff_model)
+    spans = [(a, b) for a in range(0, 2 * DAY, 97) for b in (a, a + 1, a + 60, DAY, DAY + 1, 2 * DAY)]
+    spans += [sorted((rng.randrange(2 * DAY), rng.randrange(2 * DAY))) for _ in range(500)]
+    for a, b in spans:
+        if a >= b:
+            assert tariff.cheapest(a, b) == (INF, None)
+            continue
+        price, minute = tariff.cheapest(a, b)
+        assert price == min(prices[a:b])
+        assert minute == a + prices[a:b].index(price)
+        assert tariff.min_price(a, b) == price
+
+
+def brute(prices, t, horizon):
+    # (prochain changement, prochaine minute moins chère) après t, par parcours minute par minute
+    change = next((m for m in range(t + 1, horizon) if prices[m] != prices[t]), INF)
+    cheaper = next((m for m in range(t + 1, horizon) if prices[m] < prices[t]), INF)
+    return change, cheaper
+
+
+def random_piecewise(rng, periodic):
+    # Intervalles aléatoires, avec des voisins de même prix (fusionnés par PiecewiseTariff)
+    starts = [0] + sorted(rng.sample(range(1, 600), rng.randint(0, 8)))
+    prices = [rng.choice([1, 2, 3]) / 60 for _ in starts]
+    return PiecewiseTariff(starts, prices, period=600 if periodic else None)
+
+
+def tariffs():
+    rng = random.Random(0)
+    yield from (random_piecewise(rng, periodic) for periodic in (False, True) for _ in range(20))
+    yield periodic_tariff(2)
+    yield weekly_tariff(2, 3)
+    yield calendar_tariff([3, 2, lambda hour: 5 if hour == 23 else 1], periodic=False)
+
+
+def queries(tariff, horizon):
+    # Chaque début d'intervalle, ses voisins immédiats et des instants quelconques
+    period = tariff.period or horizon
+    points = {0, horizon - 1}
+    for base in range(0, horizon, period):
+        for start in tariff.starts:
+            points.update(base + start + d for d in (-1, 0, 1))
+    rng = random.Random(len(points))
+    points.update(rng.randrange(horizon) for _ in range(200))
+    return sorted(t for t in points if 0 <= t < horizon)
+
+
+@pytest.mark.parametrize("tariff", list(tariffs()), ids=repr)
+def test_piecewise_matches_per_minute_prices(tariff):
+    # Trois périodes (ou trois fois le dernier début) : les requêtes des deux premières voient la suivante
+    length = tariff.period or max(tariff.starts[-1], 1) * 2
+    horizon = 3 * length
+    prices = expand(tariff, horizon)
+    prefix = [0]
+    for price in prices:
+        prefix.append(prefix[-1] + price)
+    if tariff.period:
+        # Le tarif se répète
+        assert prices[:length] == prices[length:2 * length] == prices[2 * length:]
+
+    rng = random.Random(horizon)
+    for t in queries(tariff, 2 * length):
+        change, cheaper = brute(prices, t, horizon)
+        assert tariff.next_change(t) == change
+        assert tariff.next_cheaper(t) == cheaper
+        end = rng.randrange(t, horizon + 1)
+        assert tariff.cost(t, end) == pytest.approx(prefix[end] - prefix[t])
+        if end > t:
+            price, minute = tariff.cheapest(t, end)
+            assert price == min(prices[t:end]) and prices[minute] == price
+            assert minute == t + prices[t:end].index(price)
+
+
+def test_price_at_breakpoints():
+    tariff = PiecewiseTariff([0, 60, 120], [1, 2, 1], period=180)
+    assert [tariff.price_at(t) for t in (0, 59, 60, 119, 120, 179, 180, 240)] == [1, 1, 2, 2, 1, 1, 1, 2]
+    # Le dernier intervalle et le premier ont le même prix : pas de changement au passage de la période
+    assert tariff.next_change(120) == 240
+    assert tariff.next_cheaper(60) == 120
+    assert tariff.cost(170, 190) == pytest.approx(20)
+
+
+def test_calendar_days():
+    tariff = weekly_tariff(2, 3)
+    day = lambda d, hour: tariff.price_at(d * DAY + hour * 60)
+    # Lundi 8h : pointe du modèle 2 ; samedi 12h : pointe du modèle 3 ; semaine suivante identique
+    assert day(0, 8) == day(7, 8) == 3 / 60
+    assert day(5, 12) == day(12, 12) == 3 / 60
+    assert day(5, 8) == 2 / 60
+    assert tariff.cost(0, 7 * DAY) == pytest.approx(tariff.cost(7 * DAY, 14 * DAY))
+
+
+def test_batch_rejects_piecewise_tariffs():
+    tasks = [[Task("A", 0, 1, 5)]]
+    with pytest.raises(ValueError):
+        simulate_batch(tasks, "EDF", periodic_tariff(2))
+    with pytest.raises(ValueError):
+        simulate_batch(tasks, "EDF", [weekly_tariff(2, 3)])
@@ -0,0 +1,152 @@
+"""
+Représentation commune des tâches.
+
+Task : une tâche, avec __slots__ (pas de __dict__ par instance). Les temps
+sont stockés en minutes ; id, r, p et d sont les noms utilisés par la
+programmation dynamique (mv2_4.py), calculés à partir des mêmes champs.
+
+TaskSet : un lot de tâches en struct-of-arrays (un tableau NumPy par champ),
+pour les gros jeux de données. Les algorithmes créent une Task seulement
+quand elle arrive : ni le TaskSet ni les Task reçues ne sont modifiés par une
+simulation, la même charge peut être rejouée sans copy.deepcopy.
+"""
+
+import numpy as np
+
+
+class Task:
+    __slots__ = ("name", "arrival_time", "execution_time", "remaining_time", "deadline")
+
+    def __init__(self, name, arrival_time, execution_time, deadline):
+        """
+        name : Identifiant (ex: "T1")
+        arrival_time : Date d'arrivée en heures (ex: 0.5 pour 0h30)
+        execution_time : Durée en heures (ex: 1.5 pour 1h30)
+        deadline : Date limite en heures (ex: 10 pour 10h00)
+        """
+        self.name = name # Nom de la tâche
+        self.arrival_time = round(arrival_time * 60) # Date d'arrivée de la tâche
+        self.execution_time = round(execution_time * 60)  # Temps d'exécution total de la tâche
+        self.remaining_time = round(execution_time * 60) # Temps d'exécution restant
+        self.deadline = round(deadline * 60) # Échéance de la tâche
+
+    @classmethod
+    def from_minutes(cls, name, arrival_time, execution_time, deadline):
+        # Construction directe à partir de temps déjà en minutes
+        task = cls.__new__(cls)
+        task.name = name
+        task.arrival_time = int(arrival_time)
+        task.execution_time = int(execution_time)
+        task.remaining_time = int(execution_time)
+        task.deadline = int(deadline)
+        return task
+
+    def copy(self):
+        # Tous les champs sont des valeurs immuables : une copie superficielle suffit
+        task = Task.__new__(Task)
+        task.name = self.name
+        task.arrival_time = self.arrival_time
+        task.execution_time = self.execution_time
+        task.remaining_time = self.remaining_time
+        task.deadline = self.deadline
+        return task
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    __copy__ = copy
+
+    def get_laxity(self, current_time):
+        # Laxité = (Échéance - Temps actuel) - Temps d'exécution restant
+        # Correspond au temps disponible avant l'échéance après avoir pris en compte le temps d'exécution restant
+        return round(((self.deadline - current_time) - self.remaining_time),2)
+
+    # Noms utilisés par la programmation dynamique (minutes)
+    @property
+    def id(self):
+        return self.name
+
+    @property
+    def r(self):
+        return self.arrival_time # Release date
+
+    @property
+    def p(self):
+        return self.execution_time # Processing time
+
+    @property
+    def d(self):
+        return self.deadline # Deadline
+
+    # Pour l'affichage graphique (heures)
+    @property
+    def original_r(self):
+        return self.arrival_time / 60
+
+    @property
+    def original_d(self):
+        return self.deadline / 60
+
+    @property
+    def duration_lbl(self):
+        return f"{self.execution_time / 60:g}h"
+
+    def __repr__(self):
+        return f"Task({self.name}, arr={self.original_r:g}h, exec={self.duration_lbl}, dead={self.original_d:g}h)"
+
+
+class TaskSet:
+    """
+    Lot de tâches en tableaux NumPy (minutes, int64) : names, arrival_time,
+    execution_time et deadline. Itérer ou indexer renvoie des Task neuves.
+    """
+
+    def __init__(self, names, arrival_time, execution_time, deadline):
+        self.names = list(names)
+        self.arrival_time = np.asarray(arrival_time, dtype=np.int64)
+        self.execution_time = np.asarray(execution_time, dtype=np.int64)
+        self.deadline = np.asarray(deadline, dtype=np.int64)
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        # TaskSet à partir d'une liste de Task (état initial, remaining_time ignoré)
+        tasks = list(tasks)
+        return cls([t.name for t in tasks],
+                   [t.arrival_time for t in tasks],
+                   [t.execution_time for t in tasks],
+                   [t.deadline for t in tasks])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.take(np.arange(len(self))[i])
+        return Task.from_minutes(self.names[i], self.arrival_time[i], self.execution_time[i], self.deadline[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def take(self, indices):
+        # Sous-ensemble (ou réordonnancement) des tâches
+        return TaskSet([self.names[i] for i in indices], self.arrival_time[indices],
+                       self.execution_time[indices], self.deadline[indices])
+
+    def by_arrival(self):
+        # Même ordre que sorted(tasks, key=arrival_time) (tri stable)
+        return self.take(np.argsort(self.arrival_time, kind="stable"))
+
+    @property
+    def nbytes(self):
+        return self.arrival_time.nbytes + self.execution_time.nbytes + self.deadline.nbytes
+
+    def __repr__(self):
+        return f"TaskSet({len(self)} tâches)"
+
+
+def task_arrays(tasks):
+    # (arrivée, temps d'exécution, deadline) d'un TaskSet ou d'une liste de Task, en tableaux
+    if not isinstance(tasks, TaskSet):
+        tasks = TaskSet.from_tasks(tasks)
+    return tasks.arrival_time, tasks.execution_time, tasks.deadline